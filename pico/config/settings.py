@@ -1,15 +1,13 @@
-from assets import jersey15_24_de, jersey20_29_de
-
 active_display = 'pico_ePaper_37_landscape'
 default_stations_config = 'home'
-refresh_rate = 30
+diagnostics = False
 display_parameters = {
     'pico_ePaper_37_landscape': {
         'display_width': 480,
         'display_height': 280,
-        'font_header_file': jersey20_29_de,
+        'font_header_file': 'jersey20_29_de',
         'font_header_size': 29,
-        'font_body_file': jersey15_24_de,
+        'font_body_file': 'jersey15_24_de',
         'font_body_size': 24,
         'margin': 5,
         'columns': {
@@ -27,11 +25,59 @@ ntp_sync_interval = 1800
 
 api_base_url = 'https://transport.opendata.ch/v1/'
 api_stationboard = 'stationboard'
+api_locations = 'locations'
 api_query_limit = 15
+api_query_limit_max = 40
+api_limit_margin = 1.5
+api_limits_file = 'query_limits.json'
+station_ids_file = 'station_ids.json'
+api_transport_filter = True
+api_backoff_base = 30
+api_backoff_max = 900
+api_budget_per_minute = 10
+api_budget_per_day = 3000
+api_budget_reserve = 0.1
+api_concurrent_fetch = False
+api_max_in_flight = 2
+api_read_chunk = 512
+api_gzip = True
+api_gzip_wbits = 13
+api_timeout = 10
 api_fields = [
     'stationboard/category',
     'stationboard/number',
     'stationboard/to',
     'stationboard/stop/departure',
     'stationboard/stop/prognosis/departure'
-]
\ No newline at end of file
+]
+
+departure_source = 'stationboard'
+gtfs_rt_url = 'https://example.org/gtfs-rt/trip-updates'
+gtfs_rt_stops = {}
+gtfs_rt_routes = {}
+proxy_url = 'http://192.168.1.10:8080/v1/'
+proxy_rows_per_stop = 12
+proxy_max_record = 4096
+
+cache_horizon = 600
+cache_max_age = 300
+board_max_rows = 32
+board_max_stations = 8
+timetable_file = 'timetable.bin'
+utc_offset = 0
+render_mode = 'local'
+render_url = 'http://192.168.1.10:8080/v1/frame'
+refresh_mode = 'full'
+refresh_max_partials = 10
+refresh_full_interval = 900
+
+fetch_min_interval = 30
+fetch_max_interval = 300
+fetch_lead = 20
+fetch_warm_configs = 1
+fetch_warm_per_board = 1
+
+update_mode = 'poll'
+events_url = 'http://192.168.1.10:8080/v1/events'
+events_retry = 30
+events_idle = 60
@@ -22,6 +22,8 @@
 #     number: Line number as string (e.g., '10', '781')
 #     to: Destination name (must match exactly)
 #     Omit monitored_connections to show all departures (unfiltered mode).
+#     The monitored categories also restrict the API request to matching transport
+#     types (tram, bus, train, ship, cableway), which keeps responses small.
 
 configurations = {
     'home': [
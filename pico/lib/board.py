@@ -0,0 +1,142 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#
+# Copyright (c) 2026 Leander Sabel
+# Licensed under the MIT License. See LICENSE
+#
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+from array import array
+
+from lib.data import departure_flags
+from lib.planner import accepts
+
+HURRY, LEAVE_NOW = 1, 2
+
+
+def classify(departures, routes, thresholds, now):
+    """Yields the departures that pass a station entry's route filter and can still be reached, with minutes and flags."""
+    for c in departures:
+        if not accepts(routes, c.category, c.number, c.to):
+            continue
+        mtd, unreachable, hurry, leave_now = departure_flags(c.epoch, thresholds, now)
+        if not unreachable:
+            yield c, mtd, HURRY if hurry else (LEAVE_NOW if leave_now else 0)
+
+
+class StringPool:
+    """Interns strings so that each distinct station, line, destination and time is held once."""
+
+    def __init__(self, capacity=128):
+        """The pool is emptied by trim once it holds more than capacity strings."""
+        self.capacity = capacity
+        self.strings = []
+        self.index = {}
+
+    def intern(self, s):
+        """Returns the index of s in the pool, adding it if it is not there yet."""
+        i = self.index.get(s)
+        if i is None:
+            i = self.index[s] = len(self.strings)
+            self.strings.append(s)
+        return i
+
+    def trim(self):
+        """Empties the pool once it outgrows its capacity; only safe while no board refers to it."""
+        if len(self.strings) > self.capacity:
+            self.strings.clear()
+            self.index.clear()
+
+
+class BoardStore:
+    """Preallocated struct-of-arrays departure board that is refilled in place on every refresh.
+
+    Stations are consecutive sections of rows; strings are indexes into a shared StringPool.
+    """
+
+    def __init__(self, capacity=32, max_stations=8, pool=None):
+        """Holds up to capacity rows across up to max_stations stations; rows beyond are dropped."""
+        self.capacity, self.max_stations = capacity, max_stations
+        self.pool = pool or StringPool()
+        self.epochs = array('i', [0] * capacity)
+        self.mtd = array('h', [0] * capacity)
+        self.flags = bytearray(capacity)
+        self.lines = array('H', [0] * capacity)
+        self.destinations = array('H', [0] * capacity)
+        self.departures = array('H', [0] * capacity)
+        self.names = array('H', [0] * max_stations)
+        self.starts = array('H', [0] * (max_stations + 1))
+        self.stations = 0
+        self.length = 0
+
+    def clear(self):
+        """Empties the board before it is refilled."""
+        self.pool.trim()
+        self.stations = self.length = 0
+        self.starts[0] = 0
+
+    def begin(self, name):
+        """Starts the section of a station, returns False if the board has no room for it."""
+        if self.stations == self.max_stations:
+            return False
+        self.names[self.stations] = self.pool.intern(name)
+        self.stations += 1
+        self.starts[self.stations] = self.length
+        return True
+
+    def offer(self, connection, mtd, flags, k):
+        """Keeps a connection if it is among the k earliest of the current station, returns False if it is not.
+
+        Rows stay sorted by departure, so candidates may be offered in any order.
+        """
+        start, end = self.starts[self.stations - 1], self.length
+        limit = min(k, self.capacity - start)
+        if limit <= 0:
+            return False
+        if end - start >= limit:
+            if self.epochs[end - 1] <= connection.epoch:
+                return False
+            end -= 1
+        i = end
+        while i > start and self.epochs[i - 1] > connection.epoch:
+            self.__move(i - 1, i)
+            i -= 1
+        intern = self.pool.intern
+        self.epochs[i], self.mtd[i], self.flags[i] = connection.epoch, mtd, flags
+        self.lines[i], self.destinations[i] = intern(connection.line), intern(connection.to)
+        self.departures[i] = intern(connection.departure)
+        self.length = end + 1
+        self.starts[self.stations] = self.length
+        return True
+
+    def __move(self, src, dst):
+        self.epochs[dst], self.mtd[dst], self.flags[dst] = self.epochs[src], self.mtd[src], self.flags[src]
+        self.lines[dst], self.destinations[dst] = self.lines[src], self.destinations[src]
+        self.departures[dst] = self.departures[src]
+
+    def __len__(self):
+        return self.stations
+
+    def signature(self):
+        """Returns the shown content of the board as a tuple; boards with equal signatures look the same."""
+        return tuple((self.name(s), tuple((self.line(i), self.destination(i), self.departure(i), self.mtd[i],
+                                           self.flags[i]) for i in self.rows(s))) for s in range(self.stations))
+
+    def name(self, s):
+        """Returns the name of the station at section s."""
+        return self.pool.strings[self.names[s]]
+
+    def rows(self, s):
+        """Returns the row indexes of the station at section s."""
+        return range(self.starts[s], self.starts[s + 1])
+
+    def line(self, i):
+        """Returns the category and number of row i."""
+        return self.pool.strings[self.lines[i]]
+
+    def destination(self, i):
+        """Returns the destination of row i."""
+        return self.pool.strings[self.destinations[i]]
+
+    def departure(self, i):
+        """Returns the HH:MM departure time of row i."""
+        return self.pool.strings[self.departures[i]]
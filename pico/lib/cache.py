@@ -0,0 +1,62 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#
+# Copyright (c) 2026 Leander Sabel
+# Licensed under the MIT License. See LICENSE
+#
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+from lib.planner import accepts
+
+
+class DepartureCache:
+    """Per-station cache of parsed connections, each carrying its absolute departure time."""
+
+    def __init__(self, horizon, max_age):
+        """Cached departures are trusted for max_age seconds if they fill the board for horizon seconds."""
+        self.horizon, self.max_age = horizon, max_age
+        self.stations = {}
+        self.outdated = set()
+        self.stats = {'hits': 0, 'misses': 0, 'evicted': 0}
+
+    def store(self, name, departures, now):
+        """Replaces the departures of a station with a list of connections."""
+        departures.sort(key=lambda c: c.epoch)
+        self.stations[name] = (now, departures)
+        self.outdated.discard(name)
+
+    def get(self, name):
+        """Returns the cached connections of a station, sorted by departure time."""
+        cached = self.stations.get(name)
+        return cached[1] if cached else []
+
+    def age(self, name, now):
+        """Returns seconds since the station was last stored, or None if it never was."""
+        cached = self.stations.get(name)
+        return now - cached[0] if cached else None
+
+    def invalidate(self, name):
+        """Stops the cache from covering a station until it is stored again; its departures are still served."""
+        self.outdated.add(name)
+
+    def evict(self, now):
+        """Drops departures that have already left."""
+        for _, departures in self.stations.values():
+            while departures and departures[0].epoch < now:
+                departures.pop(0)
+                self.stats['evicted'] += 1
+
+    def covers(self, station, now, routes=None):
+        """Returns True if the cache can fill the station's rows with reachable departures for the whole horizon.
+
+        Only departures passing the compiled route index routes count.
+        """
+        age = self.age(station['name'], now)
+        if age is None or age > self.max_age or station['name'] in self.outdated:
+            self.stats['misses'] += 1
+            return False
+        reachable_from = now + self.horizon + station['thresholds'].get('unreachable', 0) * 60
+        reachable = sum(1 for c in self.get(station['name'])
+                        if c.epoch >= reachable_from and accepts(routes, c.category, c.number, c.to))
+        hit = reachable >= station['rows']
+        self.stats['hits' if hit else 'misses'] += 1
+        return hit
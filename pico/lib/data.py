@@ -6,29 +6,82 @@
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
 import time
-from lib.utils import safe
 
 
-def parse_iso_datetime(iso8601: str):
-    """Parse ISO 8601 datetime string and return (formatted_time, minutes_until_departure)."""
+def iso_epoch(iso8601: str):
+    """Convert ISO 8601 datetime string to seconds since the epoch (UTC)."""
     year, month, day = int(iso8601[0:4]), int(iso8601[5:7]), int(iso8601[8:10])
     hours, minutes, seconds = int(iso8601[11:13]), int(iso8601[14:16]), int(iso8601[17:19])
     zone = int(iso8601[-4:-2]) if len(iso8601) >= 24 else 0
-    mtd = int((time.mktime((year, month, day, hours - zone, minutes, seconds, 0, 0)) - time.time()) / 60)
-    return iso8601[11:16], mtd
+    return time.mktime((year, month, day, hours - zone, minutes, seconds, 0, 0))
+
+
+def parse_iso_datetime(iso8601: str):
+    """Parse ISO 8601 datetime string and return (formatted_time, minutes_until_departure)."""
+    return iso8601[11:16], int((iso_epoch(iso8601) - time.time()) / 60)
+
+
+def _two_digits(s, i):
+    return (ord(s[i]) - 48) * 10 + ord(s[i + 1]) - 48
+
+
+class DepartureDecoder:
+    """Decodes ISO 8601 departure times against the cached epoch of midnight of their date and zone.
+
+    Departures on a stationboard share one or two dates, so mktime runs once per date instead of once per departure.
+    """
+
+    def __init__(self):
+        self.date = self.zone = None
+        self.midnight = 0
+
+    def epoch(self, iso8601: str):
+        """Convert ISO 8601 datetime string to seconds since the epoch (UTC)."""
+        if self.date is None or not (iso8601.startswith(self.date) and iso8601.endswith(self.zone)):
+            self.date, self.zone = iso8601[:10], iso8601[19:]
+            self.midnight = iso_epoch(self.date + 'T00:00:00' + self.zone)
+        return (self.midnight + _two_digits(iso8601, 11) * 3600
+                + _two_digits(iso8601, 14) * 60 + _two_digits(iso8601, 17))
+
+
+_decoder = DepartureDecoder()
+
+
+def departure_flags(epoch, thresholds, now):
+    """Returns the whole minutes until a departure and whether it is unreachable, a hurry or time to leave now."""
+    mtd = int((epoch - now) / 60)
+    unreachable = mtd < thresholds.get('unreachable', 0)
+    hurry = not unreachable and mtd < thresholds.get('hurry', 0)
+    leave_now = not hurry and mtd <= thresholds.get('leave_now', 0)
+    return mtd, unreachable, hurry, leave_now
 
 
 class Connection:
     """A connection represents a possible journey between two locations."""
 
-    def __init__(self, category: str, number: str, to: str, departure: str, departure_prognosis: str, thresholds: dict):
+    def __init__(self, category: str, number: str, to: str, departure: str, departure_prognosis: str, thresholds: dict, now=None):
+        """Pass the same now to every connection of a board so that their minutes agree."""
         self.category, self.number, self.to = category, number, to
-        self.departure, self.mtd = parse_iso_datetime(departure_prognosis or departure)
-        self.unreachable = self.mtd < thresholds.get('unreachable', 0)
-        self.hurry = not self.unreachable and self.mtd < thresholds.get('hurry', 0)
-        self.leave_now = not self.hurry and self.mtd <= thresholds.get('leave_now', 0)
+        self.line = category + number
+        departure = departure_prognosis or departure
+        self.departure, self.epoch = departure[11:16], _decoder.epoch(departure)
+        self.thresholds = thresholds
+        self.update(time.time() if now is None else now)
+
+    def update(self, now):
+        """Recomputes minutes until departure and the threshold flags for the given time."""
+        self.mtd, self.unreachable, self.hurry, self.leave_now = departure_flags(self.epoch, self.thresholds, now)
 
     @classmethod
-    def from_json(cls, json: str, thresholds: dict):
-        """Converts raw API connection data to a Connection object."""
-        return cls(json['category'], json['number'], json['to'], json['stop']['departure'], json['stop']['prognosis']['departure'], thresholds)
\ No newline at end of file
+    def scheduled(cls, category: str, number: str, to: str, epoch: int, departure: str, thresholds: dict):
+        """Builds a connection from a departure that is already decoded to an epoch and HH:MM time.
+
+        Minutes and flags are left to classify, which times every departure of a board against the same now.
+        """
+        connection = cls.__new__(cls)
+        connection.category, connection.number, connection.to = category, number, to
+        connection.line = category + number
+        connection.departure, connection.epoch = departure, epoch
+        connection.thresholds = thresholds
+        return connection
+
@@ -0,0 +1,66 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#
+# Copyright (c) 2026 Leander Sabel
+# Licensed under the MIT License. See LICENSE
+#
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+class EventParser:
+    """Incremental parser for server-sent events (text/event-stream), fed in chunks of any size.
+
+    Only the event and data fields are kept; comments, such as keep-alives, and other fields are skipped.
+    """
+
+    def __init__(self, on_event, max_line=512):
+        """on_event(event, data) is called with both as str once an event is complete."""
+        self.on_event = on_event
+        self.max_line = max_line
+        self.pending = b''
+        self.event = None
+        self.data = []
+
+    def feed(self, data):
+        """Consumes the next chunk of the stream."""
+        data = self.pending + bytes(data)
+        start = 0
+        while (end := data.find(b'\n', start)) >= 0:
+            self.__line(data[start:end])
+            start = end + 1
+        self.pending = data[start:]
+        if len(self.pending) > self.max_line:
+            raise ValueError('Event line too long')
+
+    def drain(self, stream, buffer):
+        """Feeds everything a non-blocking stream has ready, returns the bytes read.
+
+        Raises OSError once the stream is closed. A short read is not the end: readinto returns None when
+        nothing more is ready, and 0 only at the end of the stream.
+        """
+        view = memoryview(buffer)
+        read = 0
+        while (n := stream.readinto(buffer)) is not None:
+            if not n:
+                raise OSError('Connection closed')
+            self.feed(view[:n])
+            read += n
+        return read
+
+    def __line(self, line):
+        if line.endswith(b'\r'):
+            line = line[:-1]
+        if not line:
+            if self.data:
+                self.on_event(self.event or 'message', '\n'.join(self.data))
+            self.event = None
+            self.data = []
+            return
+        if line.startswith(b':'):
+            return
+        field, _, value = line.partition(b':')
+        if value.startswith(b' '):
+            value = value[1:]
+        if field == b'event':
+            self.event = value.decode()
+        elif field == b'data':
+            self.data.append(value.decode())
@@ -0,0 +1,145 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#
+# Copyright (c) 2026 Leander Sabel
+# Licensed under the MIT License. See LICENSE
+#
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+from framebuf import FrameBuffer, MONO_HLSB
+
+from lib.board import HURRY, LEAVE_NOW
+from lib.writer import Writer
+
+from assets import run_24, door_24, wifi_high_32, wifi_slash_32, globe_32, globe_x_32
+
+
+class Canvas(FrameBuffer):
+    """A white-filled framebuffer canvas for drawing."""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self._buf = bytearray(width * height // 8)
+        super().__init__(self._buf, width, height, MONO_HLSB)
+        self.fill(1)
+
+
+def _truncate(text, writer, max_width):
+    """Truncate text to fit within max_width pixels, adding '..' if needed."""
+    if writer.stringlen(text) <= max_width:
+        return text
+    while text and writer.stringlen(text + '..') > max_width:
+        text = text[:-1]
+    return text + '..'
+
+
+def _format_age(seconds):
+    """Format a data age compactly, in minutes below an hour and in hours above."""
+    minutes = int(seconds) // 60
+    return f'{minutes}\'' if minutes < 60 else f'{minutes // 60}h'
+
+
+def _font(name):
+    """Imports a font from assets on first use, so that only the modes drawing text load fonts."""
+    return getattr(__import__('assets.' + name), name)
+
+
+def bitmap(asset):
+    """Returns a FrameBuffer over a bitmap asset."""
+    return FrameBuffer(asset.img_bw, asset.width, asset.height, MONO_HLSB)
+
+
+def status_icon_x(params):
+    """Returns the column of the API status icon, right of the WiFi icon."""
+    return params['columns']['time'] + wifi_high_32.width + params['margin']
+
+
+class BoardLayout:
+    """Draws the departure board onto a canvas.
+
+    Shared by TransportDisplay on the device and the host renderer in utility/render.
+    """
+
+    def __init__(self, params):
+        self.params = params
+        self.canvas = Canvas(params['display_width'], params['display_height'])
+
+        self.ink_header = Writer(self.canvas, _font(params['font_header_file']))
+        self.ink_body = Writer(self.canvas, _font(params['font_body_file']))
+
+        self.icon_hurry = bitmap(run_24)
+        self.icon_leave_now = bitmap(door_24)
+        self.icon_wifi = bitmap(wifi_high_32)
+        self.icon_wifi_off = bitmap(wifi_slash_32)
+        self.icon_api = bitmap(globe_32)
+        self.icon_api_off = bitmap(globe_x_32)
+
+    def _draw_text(self, x, y, text, writer=None):
+        """Draw text at position using the specified writer."""
+        writer = writer or self.ink_body
+        writer.set_textpos(self.canvas, x, y)
+        writer.printstring(text, invert=True)
+
+    def _draw_status_icons(self, wifi_connected, api_connected, stale_age=None):
+        """Draw status icons in the upper right corner, with the age of stale data next to the API icon."""
+        margin = self.params['margin']
+        x = self.params['columns']['time']
+
+        wifi_icon = self.icon_wifi if wifi_connected else self.icon_wifi_off
+        self.canvas.blit(wifi_icon, x, 0)
+
+        if api_connected is not None:
+            api_icon = self.icon_api if api_connected else self.icon_api_off
+            api_x = status_icon_x(self.params)
+            self.canvas.blit(api_icon, api_x, 0)
+            if not api_connected and stale_age is not None:
+                self._draw_text(margin, api_x + globe_x_32.width, _format_age(stale_age))
+
+    def _fits_on_canvas(self, x, item_height):
+        """Check if an item of given height fits at position x."""
+        return x + item_height <= self.canvas.height
+
+    def _render_connection(self, board, i, x):
+        """Render row i of the board at vertical position x."""
+        cols = self.params['columns']
+
+        self._draw_text(x, cols['line'], board.line(i))
+        max_dest = cols['icon'] - cols['destination']
+        self._draw_text(x, cols['destination'], _truncate(board.destination(i), self.ink_body, max_dest))
+        self._draw_text(x, cols['time'], f'{board.departure(i)} ({board.mtd[i]}\')')
+
+        flags = board.flags[i]
+        icon = self.icon_hurry if flags & HURRY else (self.icon_leave_now if flags & LEAVE_NOW else None)
+        if icon:
+            self.canvas.blit(icon, cols['icon'], x)
+
+    def signature(self, board, wifi_connected=True, api_connected=True, stale_age=None):
+        """Returns everything draw_board draws from; equal signatures give identical canvases."""
+        age = None
+        if api_connected is not None and not api_connected and stale_age is not None:
+            age = _format_age(stale_age)
+        return wifi_connected, api_connected, age, board.signature()
+
+    def draw_board(self, board, wifi_connected=True, api_connected=True, stale_age=None):
+        """Draw the full departure board from a BoardStore onto the canvas."""
+        self.canvas.fill(1)
+        self._draw_status_icons(wifi_connected, api_connected, stale_age)
+
+        x = self.params['margin']
+        header_height = self.params['font_header_size'] + self.params['margin']
+        row_height = self.params['font_body_size']
+
+        for s in range(len(board)):
+            if not self._fits_on_canvas(x, header_height):
+                break
+            max_header = self.params['columns']['icon'] - self.params['margin']
+            self._draw_text(x, self.params['margin'], _truncate(board.name(s), self.ink_header, max_header), self.ink_header)
+            x += header_height
+
+            for i in board.rows(s):
+                if not self._fits_on_canvas(x, row_height):
+                    break
+                self._render_connection(board, i, x)
+                x += row_height
+
+            x += self.params['margin']
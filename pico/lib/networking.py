@@ -5,12 +5,26 @@
 #
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
-import network, time, requests, ntptime
+import network, time, ntptime, socket, ssl, gc, io, json, select
+import asyncio, deflate
 
 import config.settings
 from config import secrets
-from lib.data import Connection
-from lib.utils import urlencode
+from lib.board import BoardStore, classify
+from lib.cache import DepartureCache
+from lib.events import EventParser
+from lib.planner import FetchPlanner, accepts
+from lib.scheduler import Backoff
+from lib.sources import StationboardSource, GTFSRealtimeSource, ProxySource
+from lib.timetable import Timetable
+from lib.utils import split_url, urlencode
+
+# Shared by every TLS connection, as each context holds its own copy of the TLS configuration.
+_context = None
+
+# Bytes of compressed input a deflate block header and the gzip header can take before any output.
+INFLATE_MARGIN = 320
+
 
 class Networking:
     """Handles Wi-Fi connectivity."""
@@ -54,42 +68,604 @@ class Networking:
         return self.wlan.isconnected()
 
 
+def tls_context():
+    """Returns the client TLS context shared by all connections, created on first use; certificates are not verified."""
+    global _context
+    if _context is None:
+        _context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        _context.verify_mode = ssl.CERT_NONE
+    return _context
+
+
+class HTTPClient(io.IOBase):
+    """Minimal HTTP/1.1 client that keeps one connection to a host open across requests, over TLS by default.
+
+    The client is itself a stream over the current response body, so it can be wrapped by deflate.DeflateIO.
+    """
+
+    def __init__(self, host, port=443, timeout=10, tls=True):
+        """Initializes the client; the address is resolved and the connection opened on first use."""
+        self.host, self.port, self.timeout = host, port, timeout
+        self.address = None
+        self.sock = None
+        self.context = tls_context() if tls else None
+        self.stats = {'handshakes': 0, 'requests': 0, 'lookups': 0}
+        self.gzip = False
+        self.received = 0
+        self.__remaining = 0
+        self.__chunked = False
+        self.__keep_alive = False
+
+    def encode_get(self, path, gzip=False):
+        """Returns the encoded bytes of a GET request for path, to be reused across requests."""
+        accept = 'Accept-Encoding: gzip\r\n' if gzip else ''
+        return f'GET {path} HTTP/1.1\r\nHost: {self.host}\r\n{accept}\r\n'.encode()
+
+    def request(self, request):
+        """Sends a pre-encoded request and returns the response status code.
+
+        The body must then be consumed with readinto until it returns 0, or the connection closed.
+        """
+        if self.sock is not None:
+            try:
+                return self.__send(request)
+            except OSError:
+                self.close()
+        self.__connect()
+        return self.__send(request)
+
+    def readinto(self, buffer):
+        """Reads the next part of the response body into buffer, returns 0 at the end of the body."""
+        if self.__chunked and self.__remaining <= 0:
+            if self.__remaining == 0:
+                self.sock.readline()
+            self.__remaining = int(self.sock.readline().split(b';')[0], 16)
+            if self.__remaining == 0:
+                while self.sock.readline() not in (b'\r\n', b''):
+                    pass
+                self.__chunked = False
+        if self.__remaining == 0:
+            if not self.__keep_alive:
+                self.close()
+            return 0
+        if 0 < self.__remaining < len(buffer):
+            buffer = memoryview(buffer)[:self.__remaining]
+        n = self.sock.readinto(buffer)
+        if not n:
+            self.close()
+            return 0
+        if self.__remaining > 0:
+            self.__remaining -= n
+        self.received += n
+        return n
+
+    def close(self):
+        """Closes the connection, the next request opens a new one."""
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def __connect(self):
+        if self.address is None:
+            self.address = socket.getaddrinfo(self.host, self.port, 0, socket.SOCK_STREAM)[0][-1]
+            self.stats['lookups'] += 1
+        sock = socket.socket()
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.address)
+            self.sock = self.context.wrap_socket(sock, server_hostname=self.host) if self.context else sock
+        except OSError:
+            sock.close()
+            self.address = None
+            raise
+        self.stats['handshakes'] += 1
+
+    def __send(self, request):
+        self.sock.write(request)
+        status = self.sock.readline().split()
+        if len(status) < 2:
+            raise OSError('Connection closed')
+        self.stats['requests'] += 1
+        self.__remaining, self.__chunked, self.__keep_alive = -1, False, True
+        self.gzip, self.received = False, 0
+        while (line := self.sock.readline()) not in (b'\r\n', b''):
+            name, _, value = line.partition(b':')
+            name, value = name.lower(), value.lower()
+            if name == b'content-length':
+                self.__remaining = int(value)
+            elif name == b'transfer-encoding':
+                self.__chunked = b'chunked' in value
+            elif name == b'connection':
+                self.__keep_alive = b'close' not in value
+            elif name == b'content-encoding':
+                self.gzip = b'gzip' in value
+        return int(status[1])
+
+
+class PendingStream(io.IOBase):
+    """Stream over the bytes of a body received so far, so that DeflateIO can inflate it while the rest is in flight.
+
+    DeflateIO cannot wait for more input, so each readinto from it is sized to what the pending bytes can
+    always complete: at most two input bytes per output byte, plus INFLATE_MARGIN for block headers.
+    """
+
+    def __init__(self, size):
+        self.buffer = bytearray(size + 2 * INFLATE_MARGIN)
+        self.start = self.end = 0
+
+    def space(self):
+        """Returns a view of the free space after the pending bytes, to receive into before calling received."""
+        if self.start:
+            pending = self.end - self.start
+            self.buffer[:pending] = memoryview(self.buffer)[self.start:self.end]
+            self.start, self.end = 0, pending
+        return memoryview(self.buffer)[self.end:]
+
+    def received(self, n):
+        """Appends the n bytes just received into space()."""
+        self.end += n
+
+    def allowance(self, size, final=False):
+        """Returns how many of size output bytes can be inflated without running out of pending bytes."""
+        return size if final else min(size, (self.end - self.start - INFLATE_MARGIN) // 2)
+
+    def readinto(self, buffer):
+        """Reads pending bytes into buffer, returns 0 once none are left."""
+        n = min(len(buffer), self.end - self.start)
+        buffer[:n] = memoryview(self.buffer)[self.start:self.start + n]
+        self.start += n
+        return n
+
+
+class RequestBudget:
+    """Token-bucket governor that keeps API requests within a per-minute and a daily quota."""
+
+    def __init__(self, per_minute, per_day, reserve=0.1):
+        """The daily bucket holds an hour of quota; below reserve of it only uncached stations are refreshed."""
+        self.per_minute, self.per_day = per_minute, per_day
+        self.day_capacity = max(1, per_day // 24)
+        self.reserve = self.day_capacity * reserve
+        self.minute_tokens, self.day_tokens = per_minute, self.day_capacity
+        self.updated = None
+        self.day = None
+        self.stats = {'spent_today': 0, 'projected_daily': 0, 'throttled': 0, 'tokens': per_minute}
+
+    def grant(self, stations, cached, now, cost=len, granted=()):
+        """Returns the stations that may be fetched now, uncached ones first; the rest are served from cache.
+
+        cost(stations) is the number of requests that fetching them takes. Stations joining those already
+        granted are charged only for the requests they add, so a source fetching all stops at once pays once.
+        """
+        self.__refill(now)
+        low = self.day_tokens < self.reserve
+        ordered = [s for s in stations if not cached(s)] + ([] if low else [s for s in stations if cached(s)])
+        tokens = int(min(self.minute_tokens, self.day_tokens))
+        granted = list(granted)
+        base = cost(granted)
+        fits = len(ordered)
+        while fits and cost(granted + ordered[:fits]) - base > tokens:
+            fits -= 1
+        spent = cost(granted + ordered[:fits]) - base
+        self.minute_tokens -= spent
+        self.day_tokens -= spent
+        self.stats['spent_today'] += spent
+        self.stats['throttled'] += len(stations) - fits
+        self.stats['tokens'] = int(min(self.minute_tokens, self.day_tokens))
+        self.stats['projected_daily'] = self.stats['spent_today'] * 86400 // max(1, now % 86400)
+        return ordered[:fits]
+
+    def take(self, now):
+        """Spends a token on a request outside the board fetches, such as a station lookup; False if none is left."""
+        self.__refill(now)
+        if min(self.minute_tokens, self.day_tokens) < 1:
+            self.stats['throttled'] += 1
+            return False
+        self.minute_tokens -= 1
+        self.day_tokens -= 1
+        self.stats['spent_today'] += 1
+        self.stats['tokens'] = int(min(self.minute_tokens, self.day_tokens))
+        return True
+
+    def __refill(self, now):
+        if self.day != now // 86400:
+            self.day = now // 86400
+            self.stats['spent_today'] = 0
+        if self.updated is not None:
+            elapsed = now - self.updated
+            self.minute_tokens = min(self.per_minute, self.minute_tokens + elapsed * self.per_minute / 60)
+            self.day_tokens = min(self.day_capacity, self.day_tokens + elapsed * self.per_day / 86400)
+        self.updated = now
+
+
 class TransportAPIClient:
-    """Client for the Swiss public transport API."""
+    """Client for the departure backend selected by departure_source, the Swiss public transport API by default."""
 
     def __init__(self):
-        """Initializes API client with precomputed URL components."""
-        self.stationboard_url = config.settings.api_base_url + config.settings.api_stationboard
-        self.fields_query = '&'.join(f'fields[]={f}' for f in config.settings.api_fields)
+        """Initializes the departure source and the connection to its host."""
+        self.timetable = Timetable(config.settings.timetable_file, config.settings.utc_offset)
+        if config.settings.departure_source == 'gtfs_rt':
+            self.source = GTFSRealtimeSource(self.timetable.offset)
+        elif config.settings.departure_source == 'proxy':
+            self.source = ProxySource()
+        else:
+            self.source = StationboardSource()
+        self.host = self.source.host
+        self.http = HTTPClient(self.host, self.source.port, config.settings.api_timeout, self.source.tls)
+        self.fetches = FetchPlanner(config.settings.fetch_warm_configs)
+        self.requests = {}
+        self.cache = DepartureCache(config.settings.cache_horizon, config.settings.cache_max_age)
+        self.backoff = Backoff(config.settings.api_backoff_base, config.settings.api_backoff_max)
+        self.budget = RequestBudget(config.settings.api_budget_per_minute, config.settings.api_budget_per_day,
+                                    config.settings.api_budget_reserve)
+        self.board = BoardStore(config.settings.board_max_rows, config.settings.board_max_stations)
+        self.buffers = [bytearray(config.settings.api_read_chunk) for _ in range(max(1, config.settings.api_max_in_flight))]
         self.api_ok = None
+        self.stats = {'mode': None, 'board_ms': None, 'station_ms': {}, 'station_bytes': {}, 'unfiltered_bytes': {},
+                      'handshakes': 0, 'alloc_bytes': 0}
+
+    def get_tramwise_board(self, stations, due=None, warm=()):
+        """Returns the board of the given stations, refilled in place.
+
+        The due fetches, by default all the given stations grouped per stop, fetch each stop once for
+        every entry naming it. A fetch is skipped while the cache still covers the rows of its entries.
+        Fetches in warm refresh other configurations with the tokens left over.
+        """
+        self.stats['station_ms'] = {}
+        self.stats['station_bytes'] = {}
+        self.stats['handshakes'] = 0
+        handshakes = self.http.stats['handshakes']
+        gc.collect()
+        allocated = gc.mem_alloc()
+        start = time.ticks_ms()
+        now = time.time()
+        self.cache.evict(now)
+        if due is None:
+            due = self.fetches.group(stations)
+        due = [g for g in due if not self.__covered(g, now)]
+        stale = [s for s in due if self.backoff.ready(s['name'], now)]
+        cost = lambda fetches: len(self.source.batches(fetches))
+        stale = self.budget.grant(stale, lambda s: bool(self.cache.get(s['name'])), now, cost)
+        warm = [g for g in warm if self.backoff.ready(g['name'], now) and not self.__covered(g, now)]
+        if warm:
+            # Warm fetches are granted as if cached, so they never dip into the daily reserve.
+            stale += self.budget.grant(warm[:config.settings.fetch_warm_per_board], lambda s: True, now, cost, stale)
+        batches = self.source.batches(stale)
+        for batch in batches:
+            if self.source.prepare(batch, self.http, self.buffers[0], now, self.budget):
+                self.requests.pop(batch[0]['name'], None)
+            if config.settings.diagnostics and batch[0]['name'] not in self.stats['unfiltered_bytes']:
+                self.__probe(batch, now)
+        if batches:
+            if config.settings.api_concurrent_fetch:
+                self.stats['mode'] = 'concurrent'
+                asyncio.run(self.__update_batches_async(batches, now))
+            else:
+                self.stats['mode'] = 'serial'
+                for batch in batches:
+                    self.__update_batch(batch, now)
+            self.api_ok = not any(s['name'] in self.backoff.retry_at for s in stations)
+        self.stats['board_ms'] = time.ticks_diff(time.ticks_ms(), start)
+        self.stats['alloc_bytes'] = gc.mem_alloc() - allocated
+        self.stats['handshakes'] += self.http.stats['handshakes'] - handshakes
+        self.board.clear()
+        for station in stations:
+            self.__build_station_board(station, now)
+        return self.board
+
+    def __update_batch(self, batch, now):
+        """Fetches a batch of stops into the cache."""
+        start = time.ticks_ms()
+        results = self.__fetch(batch, self.buffers[0], now)
+        self.stats['station_ms'][batch[0]['name']] = time.ticks_diff(time.ticks_ms(), start)
+        self.__store(batch, results, now)
+
+    async def __update_batches_async(self, batches, now):
+        """Fetches batches into the cache with up to api_max_in_flight requests in flight at once."""
+        pending = iter(batches)
+
+        async def __worker(buffer):
+            for batch in pending:
+                start = time.ticks_ms()
+                results = await self.__fetch_async(batch, buffer, now)
+                self.stats['station_ms'][batch[0]['name']] = time.ticks_diff(time.ticks_ms(), start)
+                self.__store(batch, results, now)
+
+        workers = self.buffers[:len(batches)]
+        await asyncio.gather(*(__worker(buffer) for buffer in workers))
+
+    def __store(self, batch, results, now):
+        """Caches a fetch result; on failure the stops back off and keep their last good departures."""
+        for station in batch:
+            if results is None:
+                self.backoff.failed(station['name'], now)
+            else:
+                self.backoff.succeeded(station['name'])
+                self.cache.store(station['name'], results[station['name']], now)
 
-    def get_tramwise_board(self, stations):
-        """Returns stationboards for the given stations."""
-        self.api_ok = True
-        return [self.__get_station_board(s) for s in stations]
-
-    def __get_station_board(self, station):
-        """Fetches, filters, and sorts connections for a single station."""
-        board = self.__fetch_stationboard(station['name'])
-        routes = {(c['category'], c['number'], c['to']) for c in station.get('monitored_connections', [])}
-        filtered = [c for c in board if (c['category'], c['number'], c['to']) in routes] if routes else board
-        connections = [Connection.from_json(c, station['thresholds']) for c in filtered]
-        reachable = [c for c in connections if not c.unreachable][:station['rows']]
-        reachable.sort(key=lambda c: c.mtd)
-        return [station['name'], reachable]
-
-    def __fetch_stationboard(self, station_name) -> list:
-        """Fetches stationboard from API, returns empty list on error."""
-        url = (f'{self.stationboard_url}'
-               f'?station={urlencode(station_name)}'
-               f'&limit={config.settings.api_query_limit}'
-               f'&{self.fields_query}')
+    def __covered(self, group, now):
+        """Returns True if the cache can fill every entry served by a grouped fetch."""
+        return all(self.cache.covers(entry, now, routes) for entry, routes in group['entries'])
 
+    def staleness(self, stations, now):
+        """Returns the age in seconds of the oldest departures served during backoff, or None."""
+        ages = [self.cache.age(s['name'], now) for s in stations if s['name'] in self.backoff.retry_at]
+        ages = [age for age in ages if age is not None]
+        return max(ages) if ages else None
+
+    def __build_station_board(self, station, now):
+        """Adds the earliest reachable connections of a station entry to the board, keeping at most its rows."""
+        if not self.board.begin(station['name']):
+            return
+        for connection, mtd, flags in self.__classified(station, now):
+            self.board.offer(connection, mtd, flags, station['rows'])
+
+    def __classified(self, station, now):
+        """Yields the departures cached for a station entry's stop that pass its filter, with minutes and flags.
+
+        While no live departures are cached, scheduled ones from the timetable are used instead.
+        """
+        routes = self.fetches.filter(station)
+        thresholds = station['thresholds']
+        departures = self.cache.get(station['name'])
+        if not departures:
+            departures = self.timetable.connections(station['name'], routes, now, station['rows'], thresholds)
+        return classify(departures, routes, thresholds, now)
+
+    def __done(self, batch, decoder, results):
+        """Lets the source learn from a decoded batch, dropping its request if it has to be rebuilt."""
+        if self.source.done(batch, decoder, results):
+            self.requests.pop(batch[0]['name'], None)
+
+    def __failed(self, batch):
+        """Drops the request of a batch the server rejected."""
+        self.source.failed(batch)
+        self.requests.pop(batch[0]['name'], None)
+
+    def __request(self, batch):
+        """Returns the pre-encoded request for a batch; requests for a single stop are cached."""
+        if len(batch) > 1:
+            return self.http.encode_get(self.source.path(batch), config.settings.api_gzip)
+        request = self.requests.get(batch[0]['name'])
+        if request is None:
+            request = self.http.encode_get(self.source.path(batch), config.settings.api_gzip)
+            self.requests[batch[0]['name']] = request
+        return request
+
+    def __fetch(self, batch, buffer, now):
+        """Streams the response for a batch over the persistent connection, returns None on error."""
+        results = {station['name']: [] for station in batch}
+        decoder = self.source.decoder(batch, results, now)
+
+        try:
+            if self.http.request(self.__request(batch)) != 200:
+                self.__failed(batch)
+                raise ValueError
+            if self.http.gzip:
+                decoded = self.__feed(self.__inflate(self.http), decoder, buffer)
+                while self.http.readinto(buffer):
+                    pass
+            else:
+                decoded = self.__feed(self.http, decoder, buffer)
+            self.stats['station_bytes'][batch[0]['name']] = (self.http.received, decoded)
+            self.__done(batch, decoder, results)
+            return results
+        except (OSError, ValueError):
+            self.http.close()
+            return None
+
+    def __probe(self, batch, now):
+        """Fetches a stop once without its server-side filters and records the size next to station_bytes.
+
+        The probe is charged to the budget and waits for a token; a stop without filters, or whose probe
+        failed, is recorded as None and not probed again.
+        """
+        name = batch[0]['name']
+        path = self.source.unfiltered_path(batch)
+        if path is not None and not self.budget.take(now):
+            return
+        self.stats['unfiltered_bytes'][name] = None
+        if path is None:
+            return
+        buffer = self.buffers[0]
         try:
-            response = requests.get(url)
-            if response.status_code != 200:
+            if self.http.request(self.http.encode_get(path, config.settings.api_gzip)) != 200:
                 raise ValueError
-            return response.json().get('stationboard', [])
+            decoded = 0
+            stream = self.__inflate(self.http) if self.http.gzip else self.http
+            while n := stream.readinto(buffer):
+                decoded += n
+            while self.http.readinto(buffer):
+                pass
+            self.stats['unfiltered_bytes'][name] = (self.http.received, decoded)
+        except (OSError, ValueError):
+            self.http.close()
+
+    @staticmethod
+    def __feed(stream, decoder, buffer):
+        """Feeds a body stream to the decoder chunk by chunk, returns the number of bytes decoded."""
+        view = memoryview(buffer)
+        fed = 0
+        while n := stream.readinto(buffer):
+            decoder.feed(view[:n])
+            fed += n
+        return fed
+
+    @staticmethod
+    def __inflate(stream):
+        """Wraps a gzip-encoded stream for incremental decompression within a small window."""
+        return deflate.DeflateIO(stream, deflate.GZIP, config.settings.api_gzip_wbits)
+
+    @staticmethod
+    def __drain(inflated, pending, decoder, view, final=False):
+        """Feeds the decoder what can be inflated from the pending bytes, all of it once final is set."""
+        fed = 0
+        while (size := pending.allowance(len(view), final)) > 0 and (n := inflated.readinto(view[:size])):
+            decoder.feed(view[:n])
+            fed += n
+        return fed
+
+    async def __fetch_async(self, batch, buffer, now):
+        """Streams the response for a batch over a non-blocking socket, returns None on error."""
+        accept = 'Accept-Encoding: gzip\r\n' if config.settings.api_gzip else ''
+        request = f'GET {self.source.path(batch)} HTTP/1.0\r\nHost: {self.host}\r\n{accept}\r\n'
+        results = {station['name']: [] for station in batch}
+        decoder = self.source.decoder(batch, results, now)
+        view = memoryview(buffer)
+        received = 0
+        gzip = False
+
+        try:
+            reader, writer = await asyncio.open_connection(self.host, self.source.port, ssl=self.http.context)
+            self.stats['handshakes'] += 1
+            try:
+                writer.write(request.encode())
+                await writer.drain()
+                status = (await reader.readline()).split()
+                if len(status) < 2 or status[1] != b'200':
+                    self.__failed(batch)
+                    raise ValueError
+                while (line := (await reader.readline()).lower()) not in (b'\r\n', b''):
+                    gzip = gzip or line.startswith(b'content-encoding:') and b'gzip' in line
+                if gzip:
+                    pending = PendingStream(len(buffer))
+                    inflated = self.__inflate(pending)
+                    decoded = 0
+                    while n := await reader.readinto(pending.space()):
+                        pending.received(n)
+                        received += n
+                        decoded += self.__drain(inflated, pending, decoder, view)
+                    decoded += self.__drain(inflated, pending, decoder, view, True)
+                else:
+                    while n := await reader.readinto(buffer):
+                        decoder.feed(view[:n])
+                        received += n
+                    decoded = received
+                self.stats['station_bytes'][batch[0]['name']] = (received, decoded)
+                self.__done(batch, decoder, results)
+            finally:
+                writer.close()
+                await writer.wait_closed()
+            return results
         except (OSError, ValueError):
-            self.api_ok = False
-            return []
+            return None
+
+
+class UpdateStream:
+    """Holds one server-sent-events connection to the update endpoint and wakes the render loop on changes.
+
+    The endpoint pushes a departure event whenever the prognosis of a departure at a followed stop changes;
+    only departures passing the filter of an entry served by the stop wake the loop.
+    """
+
+    def __init__(self, url, timeout=10, retry=30, idle=60):
+        """Reconnects at most every retry seconds, and after idle seconds without even a keep-alive."""
+        self.tls, self.host, self.port, self.path = split_url(url)
+        self.timeout, self.retry, self.idle = timeout, retry, idle
+        self.context = tls_context() if self.tls else None
+        self.sock = None
+        self.poller = None
+        self.query = None
+        self.stops = {}
+        self.woken = set()
+        self.retry_at = 0
+        self.last_data = 0
+        self.received = None
+        self.parser = None
+        self.buffer = bytearray(256)
+        self.stats = {'events': 0, 'wakes': 0, 'connects': 0, 'failures': 0, 'event_to_pixel_ms': None}
+
+    def subscribe(self, groups):
+        """Follows the stops of grouped fetches, reconnecting if the set of stops changed."""
+        self.stops = {g['name']: [routes for _, routes in g['entries']] for g in groups}
+        query = '&'.join(f's={urlencode(name)}' for name in sorted(self.stops))
+        if query != self.query:
+            self.query = query
+            self.close()
+
+    def wait(self, seconds):
+        """Blocks for up to seconds, returns early with the names of stops whose monitored departures changed.
+
+        Without a connection to the endpoint, this sleeps like the fixed timer it replaces.
+        """
+        deadline = time.ticks_add(time.ticks_ms(), int(seconds * 1000))
+        while not self.woken and (remaining := time.ticks_diff(deadline, time.ticks_ms())) > 0:
+            if self.sock is None and (time.time() < self.retry_at or not self.__connect()):
+                time.sleep_ms(remaining)
+                break
+            if time.ticks_diff(time.ticks_ms(), self.last_data) > self.idle * 1000:
+                self.__failed()
+                continue
+            if not self.poller.poll(min(remaining, self.idle * 1000)):
+                continue
+            try:
+                if self.parser.drain(self.sock, self.buffer):
+                    self.last_data = time.ticks_ms()
+            except (OSError, ValueError):
+                self.__failed()
+        woken, self.woken = self.woken, set()
+        return woken
+
+    def shown(self):
+        """Records the change-to-pixel latency once the refresh triggered by an event is on the panel."""
+        if self.received is not None:
+            self.stats['event_to_pixel_ms'] = time.ticks_diff(time.ticks_ms(), self.received)
+            self.received = None
+
+    def close(self):
+        """Closes the connection, the next wait opens a new one."""
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = self.poller = None
+
+    def __connect(self):
+        if not self.query:
+            return False
+        sock = socket.socket()
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(socket.getaddrinfo(self.host, self.port, 0, socket.SOCK_STREAM)[0][-1])
+            self.sock = self.context.wrap_socket(sock, server_hostname=self.host) if self.context else sock
+            # HTTP/1.0, so that the server streams the body as is rather than chunked.
+            self.sock.write(f'GET {self.path}?{self.query} HTTP/1.0\r\nHost: {self.host}\r\n'
+                            f'Accept: text/event-stream\r\n\r\n'.encode())
+            status = self.sock.readline().split()
+            if len(status) < 2 or status[1] != b'200':
+                raise OSError('Update endpoint refused')
+            while self.sock.readline() not in (b'\r\n', b''):
+                pass
+            # A blocking readinto waits for the whole buffer, far longer than a 13-byte keep-alive; the
+            # poller says when something arrived and drain reads what is there.
+            self.sock.setblocking(False)
+        except OSError:
+            sock.close()
+            self.sock = None
+            self.stats['failures'] += 1
+            self.retry_at = time.time() + self.retry
+            return False
+        self.poller = select.poll()
+        self.poller.register(self.sock, select.POLLIN)
+        self.parser = EventParser(self.__on_event)
+        self.last_data = time.ticks_ms()
+        self.stats['connects'] += 1
+        return True
+
+    def __failed(self):
+        self.close()
+        self.stats['failures'] += 1
+        self.retry_at = time.time() + self.retry
+
+    def __on_event(self, event, data):
+        if event != 'departure':
+            return
+        self.stats['events'] += 1
+        try:
+            departure = json.loads(data)
+            name = departure['stop']
+            category, number, to = departure['category'], departure['number'], departure['to']
+        except (ValueError, KeyError):
+            return
+        if any(accepts(routes, category, number, to) for routes in self.stops.get(name, ())):
+            self.woken.add(name)
+            self.stats['wakes'] += 1
+            if self.received is None:
+                self.received = time.ticks_ms()
@@ -0,0 +1,147 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#
+# Copyright (c) 2026 Leander Sabel
+# Licensed under the MIT License. See LICENSE
+#
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import time
+
+from lib.ePaper import EinkPIO
+
+# Bytes a rectangle may waste on unchanged pixels to save the commands of a separate window.
+WINDOW_COST = 24
+
+
+def dirty_rects(new, old, pages, width, max_rects=4):
+    """Returns (first page, last page, first column, last column) rectangles covering every changed byte.
+
+    Buffers are MONO_VLSB: a page is a row of width bytes, each covering 8 vertical pixels. Changed pages
+    are merged where that wastes at most WINDOW_COST bytes, then the cheapest pairs until max_rects remain.
+    """
+    rects = []
+    for p in range(pages):
+        s = p * width
+        if new[s:s + width] == old[s:s + width]:
+            continue
+        x0, x1 = s, s + width - 1
+        while new[x0] == old[x0]:
+            x0 += 1
+        while new[x1] == old[x1]:
+            x1 -= 1
+        rect = [p, p, x0 - s, x1 - s]
+        if rects and rects[-1][1] == p - 1 and _merge_cost(rects[-1], rect) <= WINDOW_COST:
+            rects[-1] = _merged(rects[-1], rect)
+        else:
+            rects.append(rect)
+    while len(rects) > max_rects:
+        i = min(range(len(rects) - 1), key=lambda i: _merge_cost(rects[i], rects[i + 1]))
+        rects[i:i + 2] = [_merged(rects[i], rects[i + 1])]
+    return rects
+
+
+def _area(rect):
+    return (rect[1] - rect[0] + 1) * (rect[3] - rect[2] + 1)
+
+
+def _merged(a, b):
+    return [min(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), max(a[3], b[3])]
+
+
+def _merge_cost(a, b):
+    return _area(_merged(a, b)) - _area(a) - _area(b)
+
+
+class Panel(EinkPIO):
+    """EinkPIO with a partial refresh path, writing only the parts of the panel RAM that changed.
+
+    A partial refresh writes the new image to the BW RAM (0x24) and refreshes with the DU waveform, which
+    compares it with the old-data RAM (0x26). The shown image is then copied to the old-data RAM for the
+    next comparison. A full GC refresh clears the ghosting DU leaves behind; it runs after max_partials
+    partial refreshes or full_interval seconds, whichever comes first.
+
+    Both paths keep a copy of the last image sent and write only the windows around the changed bytes;
+    the rest of the controller RAM still holds the same image. The red buffer is expected to mirror the
+    BW one, as TransportDisplay and RemoteDisplay draw into both.
+    """
+
+    def __init__(self, partial=False, max_partials=10, full_interval=900, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self._rotation != 90:
+            raise ValueError('Panel windows are laid out for rotation 90')
+        self.partial = partial
+        self.max_partials = max_partials
+        self.full_interval = full_interval
+        self.partials = 0
+        self.full_at = None
+        self.pages = self.height // 8
+        self.sent = None
+        self.stats = {'full': 0, 'partial': 0, 'skipped': 0, 'full_ms': None, 'partial_ms': None, 'rects': None,
+                      'bytes': None, 'transfer_ms': None}
+
+    def refresh(self, full=False):
+        """Shows the buffers, with a partial refresh unless full is set or a full one is due.
+
+        Returns False without touching the panel if the image is the one last sent and full is not set.
+        """
+        start = time.ticks_ms()
+        if self.sent is None:
+            rects = [[0, self.pages - 1, 0, self.width - 1]]
+            self.sent = bytearray(len(self._buffer_bw))
+        else:
+            rects = dirty_rects(self._buffer_bw, self.sent, self.pages, self.width)
+            if not rects and not full:
+                self.stats['skipped'] += 1
+                return False
+        full = full or not self.partial or self.full_at is None or self.partials >= self.max_partials \
+            or time.time() - self.full_at >= self.full_interval
+        sent = self.__write(0x24, self._buffer_bw, rects)
+        if full:
+            sent += self.__write(0x26, self._buffer_red, rects)
+        transfer = time.ticks_diff(time.ticks_ms(), start)
+        self._load_LUT(1 if full else 2)
+        self._send_command(0x20)
+        self._read_busy()
+        if not full:
+            copy = time.ticks_ms()
+            sent += self.__write(0x26, self._buffer_bw, rects)
+            transfer += time.ticks_diff(time.ticks_ms(), copy)
+        self.sent[:] = self._buffer_bw
+
+        if full:
+            self.partials = 0
+            self.full_at = time.time()
+        else:
+            self.partials += 1
+        kind = 'full' if full else 'partial'
+        self.stats[kind] += 1
+        self.stats[kind + '_ms'] = time.ticks_diff(time.ticks_ms(), start)
+        self.stats['rects'] = len(rects)
+        self.stats['bytes'] = sent
+        self.stats['transfer_ms'] = transfer
+        return True
+
+    def restore(self):
+        """Puts the image last sent back into the buffers, discarding anything drawn into them since."""
+        if self.sent is None:
+            self.fill()
+        else:
+            self._buffer_bw[:] = self.sent
+            self._buffer_red[:] = self.sent
+
+    def __write(self, command, buffer, rects):
+        """Writes the rectangles of a buffer to a RAM and returns the bytes sent."""
+        # At rotation 90, a page of the buffer is 8 source lines counted down from the top, and a column
+        # is a gate line, which the address counter walks first.
+        view = memoryview(buffer)
+        top = self.height - 1
+        sent = 0
+        for p0, p1, x0, x1 in rects:
+            self._set_window(top - 8 * p0, top - 8 * p1 - 7, x0, x1)
+            self._set_cursor(top - 8 * p0, x0)
+            self._send_command(command)
+            for p in range(p0, p1 + 1):
+                self._send_buffer(view[p * self.width + x0:p * self.width + x1 + 1])
+            sent += (p1 - p0 + 1) * (x1 - x0 + 1)
+        self._set_window(top, 0, 0, self.width - 1)
+        return sent
@@ -0,0 +1,113 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#
+# Copyright (c) 2026 Leander Sabel
+# Licensed under the MIT License. See LICENSE
+#
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import json
+
+_QUOTE, _BACKSLASH, _COMMA = 0x22, 0x5c, 0x2c
+_OBJ_OPEN, _OBJ_CLOSE, _ARR_OPEN, _ARR_CLOSE = 0x7b, 0x7d, 0x5b, 0x5d
+_LITERAL = b'0123456789+-.eEtrufalsn'
+
+
+class StationboardParser:
+    """Incremental JSON tokenizer that extracts selected fields from each stationboard entry.
+
+    The response is fed in chunks of any size. Only the current token, the key path
+    and one entry are held at a time, so memory use is bounded regardless of response size.
+    """
+
+    def __init__(self, on_entry, fields, entry_path='stationboard', max_token=96, max_depth=8):
+        """Calls on_entry with one positional argument per field (in order) for every entry."""
+        self.on_entry = on_entry
+        self.count = 0
+        self.fields = {f: i for i, f in enumerate(fields)}
+        self.entry_path = entry_path
+        self.entry = [None] * len(fields)
+        self.max_depth = max_depth
+        self.token = bytearray(max_token)
+        self.token_mv = memoryview(self.token)
+        self.token_len = 0
+        self.stack = []
+        self.paths = []
+        self.path = ''
+        self.expect_key = False
+        self.in_string = self.in_literal = self.escape = self.escaped = False
+        self.is_key = self.capture = False
+
+    def feed(self, data):
+        """Consumes the next chunk of the response body."""
+        for c in data:
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif c == _BACKSLASH:
+                    self.escape = self.escaped = True
+                elif c == _QUOTE:
+                    self.in_string = False
+                    self.__string_done()
+                    continue
+                self.__append(c)
+            elif c in _LITERAL:
+                if not self.in_literal:
+                    self.in_literal, self.capture, self.token_len = True, self.path in self.fields, 0
+                self.__append(c)
+            else:
+                if self.in_literal:
+                    self.in_literal = False
+                    if self.capture:
+                        self.__value(None if self.token[0] == 0x6e else self.__token())
+                if c == _QUOTE:
+                    self.in_string, self.escaped, self.token_len = True, False, 0
+                    self.is_key = self.expect_key
+                    self.capture = self.is_key or self.path in self.fields
+                elif c == _OBJ_OPEN or c == _ARR_OPEN:
+                    self.__push(c)
+                elif c == _OBJ_CLOSE or c == _ARR_CLOSE:
+                    self.__pop()
+                elif c == _COMMA and self.stack and self.stack[-1] == _OBJ_OPEN:
+                    self.expect_key = True
+
+    def __append(self, c):
+        if self.capture and self.token_len < len(self.token):
+            self.token[self.token_len] = c
+            self.token_len += 1
+
+    def __token(self):
+        raw = bytes(self.token_mv[:self.token_len])
+        return json.loads(b'"' + raw + b'"') if self.escaped else raw.decode()
+
+    def __string_done(self):
+        if not self.is_key:
+            if self.capture:
+                self.__value(self.__token())
+            return
+        base = self.paths[-1]
+        key = self.__token()
+        self.path = base + '/' + key if base else key
+        self.expect_key = False
+
+    def __value(self, value):
+        self.entry[self.fields[self.path]] = value
+
+    def __push(self, c):
+        if len(self.stack) >= self.max_depth:
+            raise ValueError('JSON nesting too deep')
+        if c == _OBJ_OPEN and self.path == self.entry_path and self.stack and self.stack[-1] == _ARR_OPEN:
+            for i in range(len(self.entry)):
+                self.entry[i] = None
+        self.stack.append(c)
+        self.paths.append(self.path)
+        self.expect_key = c == _OBJ_OPEN
+
+    def __pop(self):
+        if not self.stack:
+            raise ValueError('Unbalanced JSON')
+        c = self.stack.pop()
+        self.path = self.paths.pop()
+        self.expect_key = False
+        if c == _OBJ_OPEN and self.path == self.entry_path and self.stack and self.stack[-1] == _ARR_OPEN:
+            self.count += 1
+            self.on_entry(*self.entry)
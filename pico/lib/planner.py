@@ -0,0 +1,174 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#
+# Copyright (c) 2026 Leander Sabel
+# Licensed under the MIT License. See LICENSE
+#
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import math
+
+from lib.utils import urlencode, load_json, save_json, get_configuration
+
+# Connection categories as returned by the API, mapped to its transportations[] filter values.
+TRANSPORTATIONS = {
+    'T': 'tram', 'TRAM': 'tram',
+    'B': 'bus', 'BN': 'bus', 'BUS': 'bus', 'EV': 'bus', 'NFB': 'bus',
+    'S': 'train', 'SN': 'train', 'R': 'train', 'RE': 'train', 'IR': 'train', 'IRE': 'train', 'IC': 'train',
+    'ICE': 'train', 'EC': 'train', 'EN': 'train', 'NJ': 'train', 'TGV': 'train', 'RJ': 'train', 'RJX': 'train',
+    'PE': 'train', 'EXT': 'train',
+    'BAT': 'ship', 'FAE': 'ship',
+    'FUN': 'cableway', 'GB': 'cableway', 'PB': 'cableway', 'SL': 'cableway',
+}
+ALL_TRANSPORTATIONS = 5
+
+
+def compile_routes(monitored):
+    """Compiles monitored connections into a {category: {number: {to}}} index, or None if all departures pass."""
+    if not monitored:
+        return None
+    index = {}
+    for c in monitored:
+        index.setdefault(c['category'], {}).setdefault(c['number'], set()).add(c['to'])
+    return index
+
+
+def accepts(index, category, number, to):
+    """Returns True if a departure passes a compiled route index, rejecting it at the first field that misses."""
+    if index is None:
+        return True
+    numbers = index.get(category)
+    if numbers is None:
+        return False
+    destinations = numbers.get(number)
+    return destinations is not None and to in destinations
+
+
+class QueryPlanner:
+    """Builds the stationboard query for each station with the narrowest parameters the API supports."""
+
+    def __init__(self, fields, limit, transport_filter=True, max_limit=40, margin=1.5, limits_file=None):
+        """Stations start at limit; learned per-station ratios are persisted to limits_file."""
+        self.fields_query = '&'.join(f'fields[]={f}' for f in fields)
+        self.default_limit, self.max_limit, self.margin = limit, max_limit, margin
+        self.transport_filter = transport_filter
+        self.limits_file = limits_file
+        self.ratios = load_json(limits_file, {}) if limits_file else {}
+
+    def query(self, station, station_id=None, narrow=True):
+        """Returns the stationboard query string for a station, by ID if one is given.
+
+        Without narrow, the transportations[] filter is left out, as for measuring what it saves.
+        """
+        where = f'id={station_id}' if station_id else f'station={urlencode(station["name"])}'
+        return (f'?{where}'
+                f'&limit={self.limit(station)}'
+                f'{self.transportations(station) if narrow else ""}'
+                f'&{self.fields_query}')
+
+    def transportations(self, station):
+        """Returns transportations[] parameters covering the monitored categories, or '' if they cannot narrow the request."""
+        monitored = station.get('monitored_connections')
+        if not self.transport_filter or not monitored:
+            return ''
+        types = set()
+        for connection in monitored:
+            transportation = TRANSPORTATIONS.get(connection['category'])
+            if transportation is None:
+                return ''
+            types.add(transportation)
+        if len(types) == ALL_TRANSPORTATIONS:
+            return ''
+        return ''.join(f'&transportations[]={t}' for t in sorted(types))
+
+    def limit(self, station):
+        """Returns how many departures to request so that the station's rows are filled with a safety margin."""
+        ratio = self.ratios.get(station['name'])
+        if ratio is None:
+            return self.default_limit
+        if ratio <= 0:
+            return self.max_limit
+        return min(max(math.ceil(station['rows'] * self.margin / ratio), station['rows']), self.max_limit)
+
+    def learn(self, station, raw, useful):
+        """Updates the station's ratio of useful to raw departures, returns True if its limit changed."""
+        if not raw:
+            return False
+        before = self.limit(station)
+        ratio = self.ratios.get(station['name'])
+        sample = useful / raw
+        self.ratios[station['name']] = round(sample if ratio is None else (ratio + sample) / 2, 3)
+        if self.limit(station) == before:
+            return False
+        if self.limits_file:
+            save_json(self.limits_file, self.ratios)
+        return True
+
+
+class FetchPlanner:
+    """Groups station entries into one fetch per stop and remembers recently used configurations to keep warm."""
+
+    def __init__(self, warm=1):
+        """Up to warm configurations other than the current one are kept warm."""
+        self.warm_count = warm
+        self.recent = []
+        self.groups = {}
+        self.filters = {}
+
+    def filter(self, station):
+        """Returns the compiled route index of a station entry, compiled once per configuration."""
+        cached = self.filters.get(id(station))
+        if cached is None or cached[0] is not station:
+            cached = self.filters[id(station)] = (station, compile_routes(station.get('monitored_connections')))
+        return cached[1]
+
+    def group(self, stations):
+        """Returns one fetch per stop, with the widest rows, thresholds and filters of the entries it serves.
+
+        Each group lists its entries as (station, route index) pairs and carries the index of its merged filter.
+        """
+        cached = self.groups.get(id(stations))
+        if cached and cached[0] is stations:
+            return cached[1]
+        groups = {}
+        for station in stations:
+            group = groups.get(station['name'])
+            if group is None:
+                groups[station['name']] = {'name': station['name'], 'rows': station['rows'],
+                                           'thresholds': dict(station['thresholds']),
+                                           'monitored_connections': list(station.get('monitored_connections') or ()),
+                                           'entries': [(station, self.filter(station))]}
+                continue
+            group['rows'] = max(group['rows'], station['rows'])
+            for key, value in station['thresholds'].items():
+                group['thresholds'][key] = min(group['thresholds'].get(key, value), value)
+            monitored = station.get('monitored_connections')
+            if not monitored or not group['monitored_connections']:
+                group['monitored_connections'] = []
+            else:
+                group['monitored_connections'] += [c for c in monitored if c not in group['monitored_connections']]
+            group['entries'].append((station, self.filter(station)))
+        for group in groups.values():
+            group['filter'] = compile_routes(group['monitored_connections'])
+        self.groups[id(stations)] = (stations, list(groups.values()))
+        return self.groups[id(stations)][1]
+
+    def use(self, key):
+        """Marks a configuration as current, returns the fetches of the recently used other ones.
+
+        Compiled groups and filters are dropped when the current configuration changes.
+        """
+        if self.recent and self.recent[0] != key:
+            self.groups.clear()
+            self.filters.clear()
+        if key in self.recent:
+            self.recent.remove(key)
+        self.recent.insert(0, key)
+        del self.recent[self.warm_count + 1:]
+        seen = {group['name'] for group in self.group(get_configuration(key))}
+        warm = []
+        for other in self.recent[1:]:
+            for group in self.group(get_configuration(other)):
+                if group['name'] not in seen:
+                    seen.add(group['name'])
+                    warm.append(group)
+        return warm
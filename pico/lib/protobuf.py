@@ -0,0 +1,119 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#
+# Copyright (c) 2026 Leander Sabel
+# Licensed under the MIT License. See LICENSE
+#
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+_TAG, _VARINT, _LENGTH, _BYTES, _SKIP = 0, 1, 2, 3, 4
+
+
+def path(*fields):
+    """Packs a path of field numbers (each at most 15) into the form ProtobufReader reports."""
+    packed = 0
+    for field in fields:
+        packed = packed << 4 | field
+    return packed
+
+
+class ProtobufReader:
+    """Incremental protobuf decoder that descends into selected submessages and reports selected fields.
+
+    Fields are addressed by their path of field numbers from the root message, packed four bits per
+    level (see path). The body is fed in chunks of any size; unselected fields are skipped unbuffered.
+    """
+
+    def __init__(self, messages, fields, on_field, on_end, max_bytes=64, max_depth=8):
+        """on_field(path, value) gets varints as int and length-delimited fields as bytes;
+        on_end(path) is called when a message at one of the paths in messages ends."""
+        self.messages, self.fields = messages, fields
+        self.on_field, self.on_end = on_field, on_end
+        self.max_depth = max_depth
+        self.token = bytearray(max_bytes)
+        self.token_mv = memoryview(self.token)
+        self.token_len = 0
+        self.ends = []
+        self.paths = []
+        self.path = 0
+        self.field = 0
+        self.pos = 0
+        self.state = _TAG
+        self.value = self.shift = 0
+        self.remaining = 0
+
+    def feed(self, data):
+        """Consumes the next chunk of the message."""
+        i, n = 0, len(data)
+        while i < n:
+            state = self.state
+            if state == _SKIP:
+                step = min(self.remaining, n - i)
+                i += step
+                self.pos += step
+                self.remaining -= step
+                if self.remaining:
+                    continue
+                self.state = _TAG
+            elif state == _BYTES:
+                if self.token_len < len(self.token):
+                    self.token[self.token_len] = data[i]
+                    self.token_len += 1
+                i += 1
+                self.pos += 1
+                self.remaining -= 1
+                if self.remaining:
+                    continue
+                self.state = _TAG
+                self.on_field(self.field, bytes(self.token_mv[:self.token_len]))
+            else:
+                c = data[i]
+                i += 1
+                self.pos += 1
+                self.value |= (c & 0x7f) << self.shift
+                if c & 0x80:
+                    self.shift += 7
+                    continue
+                value, self.value, self.shift = self.value, 0, 0
+                if state == _TAG:
+                    self.__tag(value)
+                elif state == _VARINT:
+                    self.state = _TAG
+                    if self.field in self.fields:
+                        self.on_field(self.field, value)
+                else:
+                    self.__length(value)
+            if self.state == _TAG:
+                while self.ends and self.pos >= self.ends[-1]:
+                    self.ends.pop()
+                    ended, self.path = self.path, self.paths.pop()
+                    self.on_end(ended)
+
+    def __tag(self, tag):
+        number, wire = tag >> 3, tag & 7
+        self.field = self.path << 4 | number if number < 16 else -1
+        if wire == 0:
+            self.state = _VARINT
+        elif wire == 2:
+            self.state = _LENGTH
+        elif wire == 1 or wire == 5:
+            self.state, self.remaining = _SKIP, 8 if wire == 1 else 4
+        else:
+            raise ValueError('Unsupported protobuf wire type')
+
+    def __length(self, length):
+        if self.field in self.messages:
+            if len(self.ends) >= self.max_depth:
+                raise ValueError('Protobuf nesting too deep')
+            self.ends.append(self.pos + length)
+            self.paths.append(self.path)
+            self.path = self.field
+            self.state = _TAG
+        elif self.field in self.fields:
+            self.state, self.remaining, self.token_len = _BYTES, length, 0
+            if not length:
+                self.state = _TAG
+                self.on_field(self.field, b'')
+        else:
+            self.state, self.remaining = _SKIP, length
+            if not length:
+                self.state = _TAG
@@ -0,0 +1,193 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#
+# Copyright (c) 2026 Leander Sabel
+# Licensed under the MIT License. See LICENSE
+#
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import struct
+
+# Binary board record served by utility/proxy, all little-endian:
+#   header    magic, version, station count, row count, string count, string table size
+#   stations  name string index and row count per station, in request order
+#   rows      epoch, category, number, destination and HH:MM departure string indexes, fixed size
+#   strings   length-prefixed UTF-8
+MAGIC, VERSION = b'TWBD', 1
+HEADER, STATION, ROW = '<4sBBHHH', '<HH', '<iHHHH'
+HEADER_SIZE, STATION_SIZE, ROW_SIZE = struct.calcsize(HEADER), struct.calcsize(STATION), struct.calcsize(ROW)
+
+# Panel frame served by the host renderer in utility/render:
+#   header    magic, version, flags, plane size in bytes
+#   planes    the BW and red RAM images, PackBits run-length encoded back to back;
+#             with SAME_PLANES set only the BW image is sent and the red one is a copy of it
+FRAME_MAGIC, FRAME_VERSION = b'TWFR', 1
+FRAME_HEADER = '<4sBBH'
+FRAME_HEADER_SIZE = struct.calcsize(FRAME_HEADER)
+SAME_PLANES = 1
+
+
+def pack_board(stations):
+    """Packs [(name, [(epoch, category, number, to, departure)])] into a board record."""
+    strings, index = [], {}
+
+    def intern(s):
+        if s not in index:
+            index[s] = len(strings)
+            strings.append(s)
+        return index[s]
+
+    heads, rows = [], []
+    for name, departures in stations:
+        heads.append(struct.pack(STATION, intern(name), len(departures)))
+        for epoch, category, number, to, departure in departures:
+            rows.append(struct.pack(ROW, epoch, intern(category), intern(number), intern(to), intern(departure)))
+    table = b''.join(bytes([len(e)]) + e for e in (s.encode()[:255] for s in strings))
+    header = struct.pack(HEADER, MAGIC, VERSION, len(heads), len(rows), len(strings), len(table))
+    return header + b''.join(heads) + b''.join(rows) + table
+
+
+class BoardReader:
+    """Collects a board record into a preallocated buffer and unpacks it in one pass once it is complete."""
+
+    def __init__(self, buffer, on_row):
+        """Calls on_row(station, epoch, category, number, to, departure) for every row of the record."""
+        self.buffer = buffer
+        self.on_row = on_row
+        self.length = 0
+        self.size = None
+
+    @property
+    def complete(self):
+        """True once the whole record has been unpacked."""
+        return self.size == -1
+
+    def feed(self, data):
+        """Consumes the next chunk of the record."""
+        end = self.length + len(data)
+        if end > len(self.buffer):
+            raise ValueError('Board record too large')
+        self.buffer[self.length:end] = data
+        self.length = end
+        if self.size is None and end >= HEADER_SIZE:
+            magic, version, stations, rows, _, table = struct.unpack_from(HEADER, self.buffer)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError('Not a board record')
+            self.size = HEADER_SIZE + stations * STATION_SIZE + rows * ROW_SIZE + table
+        if self.size is not None and end >= self.size:
+            self.__unpack()
+
+    def __unpack(self):
+        buffer = self.buffer
+        _, _, stations, rows, count, _ = struct.unpack_from(HEADER, buffer)
+        offset = HEADER_SIZE + stations * STATION_SIZE + rows * ROW_SIZE
+        strings = []
+        for _ in range(count):
+            length = buffer[offset]
+            strings.append(bytes(buffer[offset + 1:offset + 1 + length]).decode())
+            offset += 1 + length
+        row = HEADER_SIZE + stations * STATION_SIZE
+        for s in range(stations):
+            name, count = struct.unpack_from(STATION, buffer, HEADER_SIZE + s * STATION_SIZE)
+            for _ in range(count):
+                epoch, category, number, to, departure = struct.unpack_from(ROW, buffer, row)
+                self.on_row(strings[name], epoch, strings[category], strings[number], strings[to], strings[departure])
+                row += ROW_SIZE
+        self.size = -1
+
+
+def pack_frame(bw, red):
+    """Packs the BW and red RAM images of the panel into a frame."""
+    same = bw == red
+    planes = (bw,) if same else (bw, red)
+    header = struct.pack(FRAME_HEADER, FRAME_MAGIC, FRAME_VERSION, SAME_PLANES if same else 0, len(bw))
+    return header + b''.join(_packbits(plane) for plane in planes)
+
+
+def _packbits(data):
+    """PackBits: n < 128 is followed by n + 1 literal bytes, n >= 128 by one byte repeated n - 125 times."""
+    out, literal, i, n = bytearray(), bytearray(), 0, len(data)
+    while i < n:
+        run = 1
+        while i + run < n and run < 130 and data[i + run] == data[i]:
+            run += 1
+        if run >= 3:
+            if literal:
+                out += bytes([len(literal) - 1]) + literal
+                literal = bytearray()
+            out += bytes([run + 125, data[i]])
+            i += run
+        else:
+            literal.append(data[i])
+            i += 1
+            if len(literal) == 128:
+                out += bytes([127]) + literal
+                literal = bytearray()
+    if literal:
+        out += bytes([len(literal) - 1]) + literal
+    return bytes(out)
+
+
+class FrameReader:
+    """Decodes a frame chunk by chunk straight into the panel buffers."""
+
+    def __init__(self, bw, red):
+        self.planes = (bw, red)
+        self.header = bytearray(FRAME_HEADER_SIZE)
+        self.header_len = 0
+        self.size = len(bw)
+        self.total = None
+        self.same = False
+        self.written = 0
+        self.literal = self.run = 0
+        self.blank, self.black = b'\xff' * 130, bytes(130)
+
+    @property
+    def complete(self):
+        """True once every byte of both buffers has been written."""
+        return self.total is not None and self.written == self.total
+
+    def feed(self, data):
+        """Consumes the next chunk of the frame."""
+        i, n = 0, len(data)
+        if self.header_len < FRAME_HEADER_SIZE:
+            i = min(n, FRAME_HEADER_SIZE - self.header_len)
+            self.header[self.header_len:self.header_len + i] = data[:i]
+            self.header_len += i
+            if self.header_len < FRAME_HEADER_SIZE:
+                return
+            magic, version, flags, size = struct.unpack(FRAME_HEADER, self.header)
+            if magic != FRAME_MAGIC or version != FRAME_VERSION or size != self.size:
+                raise ValueError('Not a frame for this panel')
+            self.same = flags & SAME_PLANES
+            self.total = size if self.same else 2 * size
+        while i < n:
+            if self.literal:
+                step = min(self.literal, n - i)
+                self.__write(data[i:i + step])
+                self.literal -= step
+                i += step
+            elif self.run:
+                value = data[i]
+                self.__write(self.blank[:self.run] if value == 0xff else
+                             self.black[:self.run] if value == 0 else bytes((value,)) * self.run)
+                self.run = 0
+                i += 1
+            else:
+                c = data[i]
+                if c < 128:
+                    self.literal = c + 1
+                else:
+                    self.run = c - 125
+                i += 1
+        if self.complete and self.same:
+            self.planes[1][:] = self.planes[0]
+
+    def __write(self, data):
+        if self.written + len(data) > self.total:
+            raise ValueError('Frame too large')
+        while data:
+            plane, offset = divmod(self.written, self.size)
+            step = min(len(data), self.size - offset)
+            self.planes[plane][offset:offset + step] = data[:step]
+            self.written += step
+            data = data[step:]
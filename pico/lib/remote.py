@@ -0,0 +1,79 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#
+# Copyright (c) 2026 Leander Sabel
+# Licensed under the MIT License. See LICENSE
+#
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import time
+
+from lib.panel import Panel
+from lib.layout import bitmap, status_icon_x
+from lib.networking import HTTPClient
+from lib.protocol import FrameReader
+from lib.utils import split_url, urlencode
+
+from config import settings
+from assets import wifi_slash_32, globe_x_32
+
+
+class RemoteDisplay:
+    """Shows boards rendered by the host renderer in utility/render, without loading any fonts.
+
+    Frames are decoded straight into the panel buffers; when a frame cannot be fetched, the buffers are
+    restored from the last frame sent, which stays on the panel with an offline icon in the status corner.
+    """
+
+    def __init__(self, display_type, url):
+        self.display = Panel(settings.refresh_mode == 'partial', settings.refresh_max_partials,
+                             settings.refresh_full_interval, rotation=90)
+        self.params = settings.display_parameters[display_type]
+        tls, host, port, self.path = split_url(url)
+        self.http = HTTPClient(host, port, settings.api_timeout, tls)
+        self.buffer = bytearray(settings.api_read_chunk)
+        self.offline = False
+        self.stats = {'frames': 0, 'failures': 0, 'frame_bytes': 0, 'frame_ms': None, 'show_ms': None}
+
+    def update(self, key, wifi_connected=True):
+        """Fetches and shows the frame of a station configuration."""
+        start = time.ticks_ms()
+        reader = FrameReader(self.display._buffer_bw, self.display._buffer_red)
+        view = memoryview(self.buffer)
+        try:
+            if not wifi_connected:
+                raise OSError('No WiFi')
+            if self.http.request(self.http.encode_get(f'{self.path}?c={urlencode(key)}')) != 200:
+                raise ValueError
+            while n := self.http.readinto(self.buffer):
+                reader.feed(view[:n])
+            if not reader.complete:
+                raise ValueError('Frame truncated')
+        except (OSError, ValueError):
+            self.http.close()
+            self.stats['failures'] += 1
+            if reader.written:
+                self.display.restore()
+            self.__show_offline(wifi_connected)
+            return False
+        self.stats['frames'] += 1
+        self.stats['frame_bytes'] = self.http.received
+        self.stats['frame_ms'] = time.ticks_diff(time.ticks_ms(), start)
+        self.offline = False
+        self.__show()
+        return True
+
+    def __show_offline(self, wifi_connected):
+        """Marks the frame on the panel as outdated, once; a partly decoded frame is never shown."""
+        if self.offline:
+            return
+        self.offline = True
+        if wifi_connected:
+            self.display.blit(bitmap(globe_x_32), status_icon_x(self.params), 0)
+        else:
+            self.display.blit(bitmap(wifi_slash_32), self.params['columns']['time'], 0)
+        self.__show()
+
+    def __show(self):
+        start = time.ticks_ms()
+        self.display.refresh()
+        self.stats['show_ms'] = time.ticks_diff(time.ticks_ms(), start)
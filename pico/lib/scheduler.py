@@ -0,0 +1,100 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#
+# Copyright (c) 2026 Leander Sabel
+# Licensed under the MIT License. See LICENSE
+#
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import heapq, random
+
+from lib.planner import accepts
+
+
+class FetchScheduler:
+    """Plans per-station fetch deadlines ahead of the threshold crossings of their next departures."""
+
+    def __init__(self, min_interval, max_interval, lead):
+        """Deadlines fall lead seconds before a crossing, clamped to [min_interval, max_interval] from now."""
+        self.min_interval, self.max_interval, self.lead = min_interval, max_interval, lead
+        self.deadlines = {}
+        self.queue = []
+        self.stats = {'due': 0, 'next_in': None}
+
+    def due(self, stations, now):
+        """Returns the stations whose deadline has passed, most urgent first."""
+        by_name = {s['name']: s for s in stations}
+        for name in by_name:
+            if name not in self.deadlines:
+                self.__schedule(name, now)
+        due = []
+        while self.queue and self.queue[0][0] <= now:
+            deadline, name = heapq.heappop(self.queue)
+            if self.deadlines.get(name) != deadline:
+                continue
+            if name in by_name:
+                due.append(by_name[name])
+            else:
+                del self.deadlines[name]
+        self.stats['due'] = len(due)
+        return due
+
+    def plan(self, station, departures, now, not_before=0):
+        """Sets the next deadline of a grouped fetch from its cached connections, no earlier than not_before.
+
+        The deadline follows the earliest crossing among the entries the fetch serves.
+        """
+        crossing = now + self.max_interval + self.lead
+        for entry, routes in station['entries']:
+            thresholds = entry['thresholds']
+            unreachable = thresholds.get('unreachable', 0) * 60
+            offsets = ((thresholds.get('leave_now', 0) + 1) * 60, thresholds.get('hurry', 0) * 60, unreachable)
+            reachable = [c.epoch for c in departures
+                         if c.epoch - unreachable > now and accepts(routes, c.category, c.number, c.to)]
+            for epoch in reachable[:entry['rows']]:
+                for offset in offsets:
+                    if epoch - offset > now:
+                        crossing = min(crossing, epoch - offset)
+        deadline = min(max(crossing - self.lead, now + self.min_interval), now + self.max_interval)
+        self.__schedule(station['name'], max(deadline, not_before))
+
+    def wake(self, names, now):
+        """Makes the named stations due at once, e.g. after the update stream reported a changed prognosis."""
+        for name in names:
+            if name in self.deadlines:
+                self.__schedule(name, now)
+
+    def next_deadline(self, now):
+        """Returns the earliest pending deadline."""
+        while self.queue and self.deadlines.get(self.queue[0][1]) != self.queue[0][0]:
+            heapq.heappop(self.queue)
+        deadline = self.queue[0][0] if self.queue else now + self.max_interval
+        self.stats['next_in'] = deadline - now
+        return deadline
+
+    def __schedule(self, name, deadline):
+        self.deadlines[name] = deadline
+        heapq.heappush(self.queue, (deadline, name))
+
+
+class Backoff:
+    """Per-station exponential backoff with jitter after failed fetches."""
+
+    def __init__(self, base, maximum):
+        self.base, self.maximum = base, maximum
+        self.failures = {}
+        self.retry_at = {}
+
+    def ready(self, name, now):
+        """Returns True if the station may be fetched again."""
+        return self.retry_at.get(name, 0) <= now
+
+    def failed(self, name, now):
+        """Records a failed fetch and pushes the next attempt out by a jittered, doubling delay."""
+        failures = self.failures[name] = self.failures.get(name, 0) + 1
+        delay = min(self.maximum, self.base * 2 ** (failures - 1))
+        self.retry_at[name] = now + delay * (1 + random.random()) / 2
+
+    def succeeded(self, name):
+        """Clears the backoff of a station after a successful fetch."""
+        self.failures.pop(name, None)
+        self.retry_at.pop(name, None)
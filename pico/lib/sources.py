@@ -0,0 +1,308 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#
+# Copyright (c) 2026 Leander Sabel
+# Licensed under the MIT License. See LICENSE
+#
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import config.settings
+from lib.data import Connection
+from lib.parser import StationboardParser
+from lib.planner import QueryPlanner, accepts
+from lib.protobuf import ProtobufReader, path
+from lib.protocol import BoardReader
+from lib.scheduler import Backoff
+from lib.utils import urlencode, load_json, save_json, split_url
+
+
+class DepartureSource:
+    """Interface of a departure backend.
+
+    TransportAPIClient owns the connection: it asks the source what to request for a batch of grouped
+    fetches and feeds the response body to the decoder the source returns.
+    """
+
+    def __init__(self, url):
+        """Splits the backend URL into its host, port and base path."""
+        self.tls, self.host, self.port, self.base_path = split_url(url)
+
+    def batches(self, stations):
+        """Splits grouped fetches into requests, returns one list of fetches per request."""
+        return [[station] for station in stations]
+
+    def prepare(self, batch, http, buffer, now, budget):
+        """Runs any lookups a batch needs before its request can be built, each charged to the budget.
+
+        Returns True if a lookup changed the request, so that a cached one has to be rebuilt.
+        """
+        return False
+
+    def path(self, batch):
+        """Returns the request path of a batch."""
+        raise NotImplementedError
+
+    def unfiltered_path(self, batch):
+        """Returns the request path of a batch without server-side filters, or None if it has none."""
+        return None
+
+    def decoder(self, batch, results, now):
+        """Returns an object whose feed() consumes the response body, appending connections to results[name]."""
+        raise NotImplementedError
+
+    def done(self, batch, decoder, results):
+        """Called after a batch was decoded, returns True if its request has to be rebuilt."""
+        return False
+
+    def failed(self, batch):
+        """Called when the server rejected the request of a batch."""
+
+
+class StationResolver:
+    """Resolves station names to stable station IDs once and keeps them in a small file on flash.
+
+    A lookup that fails or finds no station backs off like a failed fetch; until then the stop is queried by name.
+    """
+
+    def __init__(self, locations_path, ids_file=None, backoff=None):
+        self.locations_path = locations_path
+        self.ids_file = ids_file
+        self.ids = load_json(ids_file, {}) if ids_file else {}
+        self.backoff = backoff or Backoff(config.settings.api_backoff_base, config.settings.api_backoff_max)
+        self.stats = {'lookups': 0, 'failures': 0, 'deferred': 0}
+
+    def get(self, name):
+        """Returns the known ID of a station, or None."""
+        return self.ids.get(name)
+
+    def resolve(self, name, http, buffer, now, budget):
+        """Looks up the ID of a station through the locations endpoint unless it is already known.
+
+        The lookup is skipped while the station backs off or the budget has no token left.
+        """
+        if name in self.ids:
+            return self.ids[name]
+        if not self.backoff.ready(name, now) or not budget.take(now):
+            self.stats['deferred'] += 1
+            return None
+        self.stats['lookups'] += 1
+        matches = []
+        parser = StationboardParser(lambda i, n: matches.append((i, n)), ('stations/id', 'stations/name'), 'stations')
+        path = (f'{self.locations_path}?query={urlencode(name)}&type=station'
+                f'&fields[]=stations/id&fields[]=stations/name')
+        view = memoryview(buffer)
+        try:
+            if http.request(http.encode_get(path)) != 200:
+                raise ValueError
+            while n := http.readinto(buffer):
+                parser.feed(view[:n])
+        except (OSError, ValueError):
+            http.close()
+            matches = []
+        station_id = next((i for i, n in matches if n == name), matches[0][0] if matches else None)
+        if station_id is None:
+            self.stats['failures'] += 1
+            self.backoff.failed(name, now)
+            return None
+        self.backoff.succeeded(name)
+        self.ids[name] = station_id
+        self.__save()
+        return station_id
+
+    def forget(self, name):
+        """Drops the ID of a station whose lookup failed, so it is resolved again on next use."""
+        if self.ids.pop(name, None) is not None:
+            self.__save()
+
+    def __save(self):
+        if self.ids_file:
+            save_json(self.ids_file, self.ids)
+
+
+class StationboardSource(DepartureSource):
+    """JSON stationboards of transport.opendata.ch, one request per stop."""
+
+    def __init__(self):
+        super().__init__(config.settings.api_base_url)
+        self.stationboard_path = self.base_path + config.settings.api_stationboard
+        self.planner = QueryPlanner(config.settings.api_fields, config.settings.api_query_limit,
+                                    config.settings.api_transport_filter, config.settings.api_query_limit_max,
+                                    config.settings.api_limit_margin, config.settings.api_limits_file)
+        self.resolver = StationResolver(self.base_path + config.settings.api_locations,
+                                        config.settings.station_ids_file)
+
+    def prepare(self, batch, http, buffer, now, budget):
+        """Resolves the station ID of the stop, returns True once it is newly known and replaces the name query."""
+        name = batch[0]['name']
+        return self.resolver.get(name) is None and self.resolver.resolve(name, http, buffer, now, budget) is not None
+
+    def path(self, batch):
+        """Returns the stationboard query of the stop, by ID once it is resolved."""
+        station = batch[0]
+        return self.stationboard_path + self.planner.query(station, self.resolver.get(station['name']))
+
+    def unfiltered_path(self, batch):
+        """Returns the stationboard query of the stop without its transportations[] filter, if it has one."""
+        station = batch[0]
+        if not self.planner.transportations(station):
+            return None
+        return self.stationboard_path + self.planner.query(station, self.resolver.get(station['name']), False)
+
+    def decoder(self, batch, results, now):
+        """Returns a stationboard parser that appends the stop's monitored departures, timed against now."""
+        station = batch[0]
+        departures = results[station['name']]
+        routes = station['filter']
+        thresholds = station['thresholds']
+
+        def __on_entry(category, number, to, departure, departure_prognosis):
+            if accepts(routes, category, number, to):
+                departures.append(Connection(category, number, to, departure, departure_prognosis, thresholds, now))
+
+        return StationboardParser(__on_entry, config.settings.api_fields)
+
+    def done(self, batch, decoder, results):
+        """Feeds the share of useful departures in the response back into the stop's query limit."""
+        station = batch[0]
+        useful = sum(1 for c in results[station['name']] if not c.unreachable)
+        return self.planner.learn(station, decoder.count, useful)
+
+    def failed(self, batch):
+        """Drops the station ID, so it is looked up again."""
+        self.resolver.forget(batch[0]['name'])
+
+
+# Field paths in a GTFS-Realtime FeedMessage.
+_ENTITY = path(2)
+_TRIP_UPDATE = path(2, 3)
+_TRIP = path(2, 3, 1)
+_TRIP_RELATIONSHIP = path(2, 3, 1, 4)
+_ROUTE_ID = path(2, 3, 1, 5)
+_DIRECTION_ID = path(2, 3, 1, 6)
+_STOP_TIME_UPDATE = path(2, 3, 2)
+_ARRIVAL = path(2, 3, 2, 2)
+_ARRIVAL_TIME = path(2, 3, 2, 2, 2)
+_DEPARTURE = path(2, 3, 2, 3)
+_DEPARTURE_TIME = path(2, 3, 2, 3, 2)
+_STOP_ID = path(2, 3, 2, 4)
+_STOP_RELATIONSHIP = path(2, 3, 2, 5)
+_CANCELED, _SKIPPED = 3, 1
+
+
+class GTFSRealtimeSource(DepartureSource):
+    """GTFS-Realtime trip updates, one feed request for all stops.
+
+    Stops and routes are mapped to the board's names through gtfs_rt_stops and gtfs_rt_routes,
+    departure times are shown in the local time returned by offset(epoch).
+    """
+
+    MESSAGES = {_ENTITY, _TRIP_UPDATE, _TRIP, _STOP_TIME_UPDATE, _ARRIVAL, _DEPARTURE}
+    FIELDS = {_TRIP_RELATIONSHIP, _ROUTE_ID, _DIRECTION_ID, _ARRIVAL_TIME, _DEPARTURE_TIME, _STOP_ID,
+              _STOP_RELATIONSHIP}
+
+    def __init__(self, offset):
+        super().__init__(config.settings.gtfs_rt_url)
+        self.feed_path = self.base_path
+        self.offset = offset
+        self.stops = {stop.encode(): name for name, stops in config.settings.gtfs_rt_stops.items() for stop in stops}
+        self.routes = {route.encode(): directions for route, directions in config.settings.gtfs_rt_routes.items()}
+
+    def batches(self, stations):
+        """Returns all fetches as one batch, served by a single feed request."""
+        return [stations] if stations else []
+
+    def path(self, batch):
+        """Returns the path of the feed."""
+        return self.feed_path
+
+    def decoder(self, batch, results, now):
+        """Returns a protobuf reader that appends the monitored stop-time updates of the batch's stops."""
+        stations = {station['name']: station for station in batch}
+        trip = {'route': None, 'direction': 0, 'canceled': False}
+        stop = {'id': None, 'time': 0, 'skipped': False}
+        pending = []
+
+        def __on_field(field, value):
+            if field == _ROUTE_ID:
+                trip['route'] = value
+            elif field == _DIRECTION_ID:
+                trip['direction'] = value
+            elif field == _TRIP_RELATIONSHIP:
+                trip['canceled'] = value == _CANCELED
+            elif field == _STOP_ID:
+                stop['id'] = value
+            elif field == _DEPARTURE_TIME or field == _ARRIVAL_TIME and not stop['time']:
+                stop['time'] = value
+            elif field == _STOP_RELATIONSHIP:
+                stop['skipped'] = value == _SKIPPED
+
+        def __on_end(message):
+            if message == _STOP_TIME_UPDATE:
+                name = self.__station(stop['id'])
+                if name in stations and stop['time'] >= now and not stop['skipped']:
+                    pending.append((name, stop['time']))
+                stop['id'], stop['time'], stop['skipped'] = None, 0, False
+            elif message == _TRIP_UPDATE:
+                route = self.routes.get(trip['route']) or {}
+                line = route.get(trip['direction'])
+                if line and not trip['canceled']:
+                    for name, epoch in pending:
+                        self.__append(stations[name], results[name], line, epoch)
+                pending.clear()
+                trip['route'], trip['direction'], trip['canceled'] = None, 0, False
+
+        return ProtobufReader(self.MESSAGES, self.FIELDS, __on_field, __on_end)
+
+    def __station(self, stop_id):
+        """Returns the station name of a stop ID, also matching platform IDs such as 8503000:0:5."""
+        if stop_id is None:
+            return None
+        name = self.stops.get(stop_id)
+        if name is None and b':' in stop_id:
+            name = self.stops.get(stop_id[:stop_id.find(b':')])
+        return name
+
+    def __append(self, station, departures, line, epoch):
+        category, number, to = line
+        if accepts(station['filter'], category, number, to):
+            minutes = (epoch + self.offset(epoch)) % 86400 // 60
+            departures.append(Connection.scheduled(category, number, to, epoch, f'{minutes // 60:02d}:{minutes % 60:02d}',
+                                                   station['thresholds']))
+
+
+class ProxySource(DepartureSource):
+    """Packed binary boards of the aggregation proxy in utility/proxy, one request for all stops.
+
+    The proxy polls each stop once for all devices; filters and thresholds are still applied on the device.
+    """
+
+    def __init__(self):
+        super().__init__(config.settings.proxy_url)
+        self.board_path = self.base_path + 'board'
+        self.record = bytearray(config.settings.proxy_max_record)
+
+    def batches(self, stations):
+        """Returns all fetches as one batch, served by a single board request."""
+        return [stations] if stations else []
+
+    def path(self, batch):
+        """Returns the board query naming every stop of the batch."""
+        stops = '&'.join(f's={urlencode(station["name"])}' for station in batch)
+        return f'{self.board_path}?limit={config.settings.proxy_rows_per_stop}&{stops}'
+
+    def decoder(self, batch, results, now):
+        """Returns a board reader that appends the monitored departures of the batch's stops."""
+        stations = {station['name']: station for station in batch}
+
+        def __on_row(name, epoch, category, number, to, departure):
+            station = stations.get(name)
+            if station is not None and accepts(station['filter'], category, number, to):
+                results[name].append(Connection.scheduled(category, number, to, epoch, departure,
+                                                          station['thresholds']))
+
+        return BoardReader(self.record, __on_row)
+
+    def done(self, batch, decoder, results):
+        """Rejects a record that ended early."""
+        if not decoder.complete:
+            raise ValueError('Board record truncated')
+        return False
@@ -0,0 +1,121 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#
+# Copyright (c) 2026 Leander Sabel
+# Licensed under the MIT License. See LICENSE
+#
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import struct
+from array import array
+
+from lib.data import Connection
+from lib.planner import accepts
+
+# Layout of the index written by utility/timetable/gtfs_to_index.py, all little-endian:
+#   header       magic, version, zone count, string count, route count, departure count
+#   zones        (utc_start, offset_minutes) per UTC offset change, ascending
+#   strings      length-prefixed UTF-8 station names, categories, numbers and destinations
+#   routes       station, category, number and destination string indexes, then 8 departure offsets
+#                delimiting the Monday..Sunday lists
+#   departures   minutes after local midnight, ascending within each list
+MAGIC, VERSION = b'TWTT', 1
+HEADER, ZONE, ROUTE = '<4sBHHHI', '<ih', '<4H8I'
+DAY = 86400
+
+
+class Timetable:
+    """Scheduled departures from a precompiled timetable index on flash, used while live data is missing."""
+
+    def __init__(self, path, utc_offset=0):
+        """The index is loaded on first use; a missing or invalid file leaves the timetable empty.
+
+        Without an index, local time is UTC plus utc_offset minutes.
+        """
+        self.path = path
+        self.utc_offset = utc_offset
+        self.loaded = False
+        self.zones, self.strings, self.routes = [], [], []
+        self.stations = {}
+        self.departures = array('H')
+        self.stats = {'served': 0}
+
+    def connections(self, station, routes, now, count, thresholds):
+        """Returns up to count scheduled connections of a stop that can still be reached, given its compiled routes."""
+        if not self.loaded:
+            self.__load()
+        start = now + thresholds.get('unreachable', 0) * 60
+        found = []
+        for route in self.stations.get(station, ()):
+            _, category, number, to, offsets = self.routes[route]
+            if not accepts(routes, self.strings[category], self.strings[number], self.strings[to]):
+                continue
+            for epoch in self.__next(offsets, start, count):
+                found.append((epoch, route))
+        found.sort()
+        result = []
+        for epoch, route in found[:count]:
+            _, category, number, to, _ = self.routes[route]
+            minutes = (epoch + self.offset(epoch)) % DAY // 60
+            result.append(Connection.scheduled(self.strings[category], self.strings[number], self.strings[to],
+                                               epoch, f'{minutes // 60:02d}:{minutes % 60:02d}', thresholds))
+        self.stats['served'] += len(result)
+        return result
+
+    def __next(self, offsets, now, count):
+        """Yields the epochs of up to count departures of a route from now on, today and on the following days."""
+        offset = self.offset(now)
+        local = now + offset
+        midnight = local - local % DAY
+        minute = (local - midnight) // 60
+        day = (midnight // DAY + 3) % 7
+        for shift in range(7):
+            weekday = (day + shift) % 7
+            lo, hi = offsets[weekday], offsets[weekday + 1]
+            i = self.__search(lo, hi, minute) if shift == 0 else lo
+            while i < hi and count:
+                yield midnight + shift * DAY + self.departures[i] * 60 - offset
+                i += 1
+                count -= 1
+            if not count:
+                return
+
+    def __search(self, lo, hi, minute):
+        departures = self.departures
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if departures[mid] < minute:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def offset(self, now):
+        """Returns the local UTC offset in seconds at now, or the configured one without an index."""
+        if not self.loaded:
+            self.__load()
+        offset = self.utc_offset * 60
+        for start, minutes in self.zones:
+            if start > now:
+                break
+            offset = minutes * 60
+        return offset
+
+    def __load(self):
+        self.loaded = True
+        try:
+            with open(self.path, 'rb') as f:
+                magic, version, zones, strings, routes, departures = struct.unpack(HEADER, f.read(struct.calcsize(HEADER)))
+                if magic != MAGIC or version != VERSION:
+                    return
+                size = struct.calcsize(ZONE)
+                self.zones = [struct.unpack(ZONE, f.read(size)) for _ in range(zones)]
+                self.strings = [f.read(f.read(1)[0]).decode() for _ in range(strings)]
+                size = struct.calcsize(ROUTE)
+                for i in range(routes):
+                    fields = struct.unpack(ROUTE, f.read(size))
+                    self.routes.append(fields[:4] + (fields[4:],))
+                    self.stations.setdefault(self.strings[fields[0]], []).append(i)
+                self.departures = array('H', bytearray(2 * departures))
+                f.readinto(self.departures)
+        except (OSError, ValueError, IndexError):
+            self.zones, self.strings, self.routes, self.stations = [], [], [], {}
@@ -5,6 +5,8 @@
 #
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
+import json
+
 SAFE_CHARS = b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_.~'
 
 
@@ -13,6 +15,14 @@ def urlencode(s):
     return ''.join(chr(c) if c in SAFE_CHARS else f'%{c:02X}' for c in s.encode('utf-8'))
 
 
+def split_url(url):
+    """Split an http(s) URL into (tls, host, port, path)."""
+    authority = url.split('/')[2]
+    tls = url.startswith('https:')
+    host, _, port = authority.partition(':')
+    return tls, host, int(port) if port else 443 if tls else 80, url.split(authority, 1)[1]
+
+
 def safe(func, default=None):
     """Execute func and return its result, or default if any exception occurs."""
     try:
@@ -21,8 +31,31 @@ def safe(func, default=None):
         return default
 
 
-def get_stations(ssid):
-    """Resolve station config for the given SSID, falling back to the default."""
+def load_json(path, default=None):
+    """Load a JSON file from flash, or return default if it is missing or unreadable."""
+    def __load():
+        with open(path) as f:
+            return json.load(f)
+    return safe(__load, default)
+
+
+def save_json(path, data):
+    """Write data to a JSON file on flash, returns False if it could not be written."""
+    try:
+        with open(path, 'w') as f:
+            json.dump(data, f)
+        return True
+    except OSError:
+        return False
+
+
+def get_config_key(ssid):
+    """Resolve the configuration name for the given SSID, falling back to the default."""
     import config.settings, config.stations
-    key = config.stations.ssid_configs.get(ssid, config.settings.default_stations_config)
-    return config.stations.configurations[key]
\ No newline at end of file
+    return config.stations.ssid_configs.get(ssid, config.settings.default_stations_config)
+
+
+def get_configuration(key):
+    """Return the station list of a named configuration, or an empty tuple if it does not exist."""
+    import config.stations
+    return config.stations.configurations.get(key, ())
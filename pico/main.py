@@ -10,23 +10,74 @@ import time
 
 import config.settings
 from lib.display import TransportDisplay
-from lib.networking import Networking, TransportAPIClient
-from lib.utils import get_stations
+from lib.networking import Networking, TransportAPIClient, UpdateStream
+from lib.remote import RemoteDisplay
+from lib.scheduler import FetchScheduler
+from lib.utils import get_config_key, get_configuration
 
 
 def main():
+    if config.settings.render_mode == 'remote':
+        return main_remote()
+
     display = TransportDisplay(config.settings.active_display)
     net = Networking()
     api = TransportAPIClient()
+    scheduler = FetchScheduler(config.settings.fetch_min_interval, config.settings.fetch_max_interval,
+                               config.settings.fetch_lead)
+    stream = None
+    if config.settings.update_mode == 'events':
+        stream = UpdateStream(config.settings.events_url, config.settings.api_timeout,
+                              config.settings.events_retry, config.settings.events_idle)
+
+    while True:
+        if not net.is_connected():
+            net.connect_to_wifi()
+
+        net.sync_time(config.settings.ntp_sync_interval)
+        key = get_config_key(net.ssid)
+        stations = get_configuration(key)
+        warm = api.fetches.use(key)
+        now = time.time()
+        groups = api.fetches.group(stations)
+        due = scheduler.due(groups, now)
+        board = api.get_tramwise_board(stations, due, warm)
+        for station in due:
+            retry_at = api.backoff.retry_at.get(station['name'], 0)
+            scheduler.plan(station, api.cache.get(station['name']), now, retry_at)
+        display.display_board(board, net.is_connected(), api.api_ok, api.staleness(stations, now))
+        if stream:
+            stream.shown()
+        if config.settings.diagnostics:
+            print(api.stats, api.cache.stats, api.budget.stats, scheduler.stats, display.stats, display.display.stats)
+            if stream:
+                print(stream.stats)
+        next_minute = (time.time() // 60 + 1) * 60
+        sleep = max(0, min(scheduler.next_deadline(now), next_minute) - time.time())
+        if stream:
+            stream.subscribe(groups)
+            woken = stream.wait(sleep)
+            for name in woken:
+                api.cache.invalidate(name)
+            scheduler.wake(woken, time.time())
+        else:
+            time.sleep(sleep)
+
+
+def main_remote():
+    """Shows frames rendered by the host renderer, refreshed every minute."""
+    display = RemoteDisplay(config.settings.active_display, config.settings.render_url)
+    net = Networking()
 
     while True:
         if not net.is_connected():
             net.connect_to_wifi()
 
         net.sync_time(config.settings.ntp_sync_interval)
-        board = api.get_tramwise_board(get_stations(net.ssid))
-        display.display_board(board, net.is_connected(), api.api_ok)
-        time.sleep(config.settings.refresh_rate)
+        display.update(get_config_key(net.ssid), net.is_connected())
+        if config.settings.diagnostics:
+            print(display.stats, display.display.stats)
+        time.sleep(max(0, (time.time() // 60 + 1) * 60 - time.time()))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
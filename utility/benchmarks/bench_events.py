@@ -0,0 +1,152 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#
+# Copyright (c) 2026 Leander Sabel
+# Licensed under the MIT License. See LICENSE
+#
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / 'pico'))
+sys.path.insert(0, str(ROOT / 'utility' / 'render'))
+sys.path.insert(0, str(ROOT / 'utility' / 'proxy'))
+
+from renderer import FrameRenderer
+from server import StopCache, serve
+from standin import StandIn
+from events import Broker
+
+from lib.events import EventParser
+from lib.protocol import BoardReader
+
+parser = argparse.ArgumentParser(prog="Update channel latency benchmark")
+parser.add_argument("-d", "--devices", type=int, default=50, help="Event stream clients to connect")
+parser.add_argument("-s", "--stations", type=int, default=20, help="Distinct stops shared by all clients")
+parser.add_argument("-k", "--per-device", type=int, default=3, help="Stops per client")
+parser.add_argument("-n", "--changes", type=int, default=10, help="Delays to inject upstream")
+parser.add_argument("-w", "--watch", type=int, default=5, help="Seconds between upstream fetches of followed stops")
+parser.add_argument("-r", "--refresh", type=float, default=60, help="Fixed polling timer to compare with, in seconds")
+parser.add_argument("--delay", type=float, default=0.05, help="Stand-in answer delay in seconds")
+args = parser.parse_args()
+
+
+async def client(stops, host, port, base, on_event, ready):
+    """Follows stops at the proxy's event stream like UpdateStream, calling on_event(departure, received)."""
+    query = '&'.join(f's={urllib.parse.quote(name)}' for name in stops)
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f'GET {base}events?{query} HTTP/1.0\r\nHost: {host}\r\nAccept: text/event-stream\r\n\r\n'.encode())
+    await writer.drain()
+    if b' 200 ' not in await reader.readline():
+        raise OSError('Update endpoint refused')
+    while await reader.readline() not in (b'\r\n', b''):
+        pass
+    ready.release()
+    events = EventParser(lambda event, data: on_event(json.loads(data), time.time()))
+    try:
+        while chunk := await reader.read(256):
+            events.feed(chunk)
+    finally:
+        writer.close()
+
+
+def board(proxy, stops):
+    """Fetches and decodes the packed board of stops, returning departures per stop name like the renderer wants."""
+    query = '&'.join(f's={urllib.parse.quote(name)}' for name in stops)
+    with urllib.request.urlopen(f'{proxy}board?limit=12&{query}', timeout=10) as response:
+        body = response.read()
+    departures = {}
+    decoder = BoardReader(bytearray(4096), lambda name, *row: departures.setdefault(name, []).append(row))
+    decoder.feed(body)
+    if not decoder.complete:
+        raise ValueError('truncated record')
+    return departures
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))] if values else float('nan')
+
+
+async def run():
+    rng = random.Random(11)
+    pool = [f'Stop {i:03d}' for i in range(args.stations)]
+    follows = [rng.sample(pool, args.per_device) for _ in range(args.devices)]
+    standin = StandIn(args.delay)
+    upstream = f'http://127.0.0.1:{standin.serve("127.0.0.1", 0).server_address[1]}/v1/'
+    cache = StopCache(upstream, 40, 15, 120, 10, Broker())
+    cache.watch(args.watch)
+    server = serve('127.0.0.1', 0, cache)
+    proxy = f'http://127.0.0.1:{server.server_address[1]}/v1/'
+
+    # Client 0 runs the device pipeline on every event: fetch its board, decode it and render the panel RAM.
+    thresholds = {'leave_now': 0, 'hurry': 0, 'unreachable': 0}
+    configuration = [{'name': name, 'rows': 4, 'thresholds': thresholds} for name in follows[0]]
+    with tempfile.NamedTemporaryFile('w', suffix='.py', delete=False) as stations:
+        stations.write(f'configurations = {{"bench": {configuration!r}}}\n')
+    try:
+        renderer = FrameRenderer(stations.name)
+    finally:
+        os.unlink(stations.name)
+    injected, delivered, to_pixel, pending = {}, [], [], asyncio.Queue()
+    loop = asyncio.get_running_loop()
+
+    def on_event(number, departure, received):
+        change = injected.get(departure['stop'])
+        if change is not None:
+            delivered.append(received - change)
+            if number == 0:
+                pending.put_nowait((departure, change))
+
+    async def pipeline():
+        while True:
+            departure, change = await pending.get()
+            departures = await loop.run_in_executor(None, board, proxy, follows[0])
+            await loop.run_in_executor(None, renderer.frame, 'bench', departures, int(time.time()))
+            shown = any(row[0] == departure['epoch'] for row in departures.get(departure['stop'], ()))
+            to_pixel.append((time.time() - change, shown))
+
+    ready = asyncio.Semaphore(0)
+    url = urllib.parse.urlsplit(proxy)
+    tasks = [asyncio.create_task(client(stops, url.hostname, url.port, url.path,
+                                        lambda d, t, n=n: on_event(n, d, t), ready)) for n, stops in enumerate(follows)]
+    tasks.append(asyncio.create_task(pipeline()))
+    for _ in follows:
+        await ready.acquire()
+    # Let the proxy fetch every followed stop once, so that the next fetch has something to compare with.
+    await asyncio.sleep(args.watch + 2)
+    for _ in range(args.changes):
+        name = rng.choice(follows[0] if rng.random() < 0.5 else pool)
+        injected[name] = time.time()
+        await loop.run_in_executor(None, standin.inject, name, 180)
+        await asyncio.sleep(args.watch + 1)
+    await asyncio.sleep(1)
+    for task in tasks:
+        task.cancel()
+    return cache, standin, delivered, to_pixel
+
+
+cache, standin, delivered, to_pixel = asyncio.run(run())
+followed = len({name for name in cache.trips})
+print(f'{args.devices} clients following {args.per_device} of {args.stations} stops, {args.changes} delays injected, '
+      f'followed stops fetched every {args.watch} s')
+print(f'change→event   p50 {percentile(delivered, 50) * 1e3:7.0f} ms  p95 {percentile(delivered, 95) * 1e3:7.0f} ms'
+      f'  max {max(delivered, default=0) * 1e3:7.0f} ms  ({len(delivered)} deliveries)')
+if to_pixel:
+    latencies = [t for t, _ in to_pixel]
+    print(f'change→pixel   p50 {percentile(latencies, 50) * 1e3:7.0f} ms  max {max(latencies) * 1e3:7.0f} ms'
+          f'  (client 0, {sum(s for _, s in to_pixel)}/{len(to_pixel)} boards carried the delay)')
+print(f'fixed timer    avg {args.refresh / 2 * 1e3:7.0f} ms  max {args.refresh * 1e3:7.0f} ms  (refresh every {args.refresh:g} s)')
+print(f'upstream       {standin.stats["requests"]:8d} fetches for {followed} followed stops, '
+      f'{cache.stats["changes"]} changes published')
+print('The panel refresh itself comes on top; on the device, event_to_pixel_ms in the diagnostics covers it.')
@@ -0,0 +1,51 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#
+# Copyright (c) 2026 Leander Sabel
+# Licensed under the MIT License. See LICENSE
+#
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import argparse
+import calendar
+import sys
+import time
+from pathlib import Path
+
+# MicroPython's mktime takes an 8-tuple and the device clock runs in UTC.
+time.mktime = lambda t: calendar.timegm(tuple(t[:6]) + (0, 0, 0))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'pico'))
+
+from lib.data import DepartureDecoder, iso_epoch, parse_iso_datetime
+
+parser = argparse.ArgumentParser(prog="ISO departure decoding benchmark")
+parser.add_argument("-n", "--departures", type=int, default=40, help="Departures per board")
+parser.add_argument("-r", "--rounds", type=int, default=2000, help="Boards to decode")
+args = parser.parse_args()
+
+
+def departures(count):
+    start = time.time() - time.time() % 60
+    stamps = (time.gmtime(start + i * 137) for i in range(count))
+    return ['%04d-%02d-%02dT%02d:%02d:%02d+0200' % t[:6] for t in stamps]
+
+
+def bench(label, board, decode):
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        for iso in board:
+            decode(iso)
+    elapsed = time.perf_counter() - start
+    print(f'{label:<20} {elapsed * 1e9 / (args.rounds * len(board)):8.0f} ns/departure')
+    return elapsed
+
+
+board = departures(args.departures)
+decoder = DepartureDecoder()
+mismatches = [iso for iso in board if decoder.epoch(iso) != iso_epoch(iso)]
+if mismatches:
+    sys.exit(f'Decoder disagrees with iso_epoch on {mismatches[0]}')
+
+now = time.time()
+baseline = bench('parse_iso_datetime', board, parse_iso_datetime)
+fast = bench('DepartureDecoder', board, lambda iso: (iso[11:16], int((decoder.epoch(iso) - now) / 60)))
+print(f'speedup {baseline / fast:.1f}x')
@@ -0,0 +1,124 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#
+# Copyright (c) 2026 Leander Sabel
+# Licensed under the MIT License. See LICENSE
+#
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import argparse
+import calendar
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# MicroPython's mktime takes an 8-tuple and the device clock runs in UTC.
+time.mktime = lambda t: calendar.timegm(tuple(t[:6]) + (0, 0, 0))
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'pico'))
+
+import config.settings
+from lib.planner import compile_routes
+from lib.sources import StationboardSource, GTFSRealtimeSource
+
+STATION, STOP, OFFSET = 'Zürich, Paradeplatz', '8591299', 7200
+LINES = {'r2': {0: ('T', '2', 'Schlieren, Geissweid'), 1: ('T', '2', 'Zürich, Tiefenbrunnen')},
+         'r13': {0: ('T', '13', 'Zürich, Albisgütli'), 1: ('T', '13', 'Frankental')}}
+
+parser = argparse.ArgumentParser(prog="Departure source benchmark")
+parser.add_argument("-n", "--departures", type=int, default=40, help="Departures at the monitored stop")
+parser.add_argument("-t", "--trips", type=int, default=400, help="Trips in the stand-in GTFS-RT feed")
+parser.add_argument("-r", "--rounds", type=int, default=50, help="Decodes per source")
+parser.add_argument("-c", "--chunk", type=int, default=512, help="Bytes fed per call, like api_read_chunk")
+parser.add_argument("-o", "--out", type=str, help="Directory to keep the stand-in files in")
+args = parser.parse_args()
+
+
+def varint(value):
+    out = bytearray()
+    while True:
+        byte, value = value & 0x7f, value >> 7
+        out.append(byte | (0x80 if value else 0))
+        if not value:
+            return bytes(out)
+
+
+def field(number, value):
+    """Encodes one protobuf field: int as varint, bytes or str as length-delimited."""
+    if isinstance(value, int):
+        return varint(number << 3) + varint(value)
+    value = value.encode() if isinstance(value, str) else value
+    return varint(number << 3 | 2) + varint(len(value)) + value
+
+
+def stand_in(now):
+    """Returns a stationboard JSON body and a GTFS-RT feed carrying the same departures at STOP."""
+    rng = random.Random(1)
+    board, entities = [], []
+    stop_trips = set(rng.sample(range(args.trips), min(args.departures, args.trips)))
+    for trip in range(args.trips):
+        route = rng.choice(sorted(LINES))
+        direction = rng.randrange(2)
+        updates = []
+        for sequence, stop in enumerate(rng.sample(range(8500000, 8590000), 12)):
+            epoch = now + rng.randrange(60, 5400)
+            stop_id = f'{STOP}:0:{sequence % 4}' if trip in stop_trips and sequence == 5 else str(stop)
+            if stop_id.startswith(STOP):
+                category, number, to = LINES[route][direction]
+                iso = time.strftime('%Y-%m-%dT%H:%M:%S+0200', time.gmtime(epoch + OFFSET))
+                board.append({'stop': {'departure': iso, 'prognosis': {'departure': None}},
+                              'category': category, 'number': number, 'to': to})
+            updates.append(field(2, field(1, sequence) + field(3, field(1, 30) + field(2, epoch)) + field(4, stop_id)))
+        descriptor = field(1, f'trip-{trip}') + field(5, route) + field(6, direction)
+        entities.append(field(2, field(1, f'e{trip}') + field(3, field(1, descriptor) + b''.join(updates))))
+    header = field(1, field(1, '2.0') + field(3, now))
+    feed = header + b''.join(entities)
+    board.sort(key=lambda e: e['stop']['departure'])
+    return json.dumps({'stationboard': board}).encode(), feed
+
+
+def decode(source, body, now, chunk=None):
+    station = {'name': STATION, 'rows': 4, 'thresholds': {}, 'monitored_connections': [], 'filter': compile_routes(None)}
+    results = {STATION: []}
+    decoder = source.decoder([station], results, now)
+    view = memoryview(body)
+    chunk = chunk or args.chunk
+    for i in range(0, len(body), chunk):
+        decoder.feed(view[i:i + chunk])
+    return results[STATION]
+
+
+def bench(label, source, body, now):
+    tracemalloc.start()
+    decode(source, body, now)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        decode(source, body, now)
+    elapsed = (time.perf_counter() - start) / args.rounds
+    print(f'{label:<12} {len(body):8d} bytes {elapsed * 1e3:8.2f} ms/decode {peak / 1024:8.1f} KiB peak')
+
+
+now = int(time.time())
+config.settings.gtfs_rt_stops = {STATION: [STOP]}
+config.settings.gtfs_rt_routes = LINES
+json_body, feed = stand_in(now)
+if args.out:
+    Path(args.out).mkdir(parents=True, exist_ok=True)
+    (Path(args.out) / 'stationboard.json').write_bytes(json_body)
+    (Path(args.out) / 'trip_updates.pb').write_bytes(feed)
+
+stationboard, realtime = StationboardSource(), GTFSRealtimeSource(lambda epoch: OFFSET)
+key = lambda c: (c.line, c.to, c.epoch, c.departure)
+expected = sorted(map(key, decode(stationboard, json_body, now)))
+if sorted(map(key, decode(realtime, feed, now))) != expected:
+    sys.exit('GTFS-RT departures differ from the stationboard')
+for chunk in (1, 7, 64):
+    if sorted(map(key, decode(realtime, feed, now, chunk))) != expected:
+        sys.exit(f'GTFS-RT decoding differs when fed {chunk} bytes at a time')
+print(f'self-check ok: {len(expected)} departures at {STATION} from {args.trips} trips')
+
+bench('stationboard', stationboard, json_body, now)
+bench('gtfs-rt', realtime, feed, now)
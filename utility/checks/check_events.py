@@ -0,0 +1,56 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#
+# Copyright (c) 2026 Leander Sabel
+# Licensed under the MIT License. See LICENSE
+#
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import socket
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / 'pico'))
+
+from lib.events import EventParser
+
+# An unbuffered file over a non-blocking socket returns None from readinto when nothing is ready, like a
+# MicroPython socket after setblocking(False), which is how UpdateStream reads the update endpoint.
+device, server = socket.socketpair()
+device.setblocking(False)
+stream = device.makefile('rb', buffering=0)
+events = []
+parser = EventParser(lambda event, data: events.append((event, data)))
+buffer = bytearray(256)
+
+server.sendall(b': keepalive\n\n')
+start = time.monotonic()
+read = parser.drain(stream, buffer)
+assert read == 13, f'keep-alive shorter than the buffer: read {read} of 13 bytes'
+assert time.monotonic() - start < 0.5, 'drain waited for a full buffer'
+assert not events, events
+
+assert parser.drain(stream, buffer) == 0, 'drain with nothing ready'
+
+part = b'event: departure\ndata: {"stop": "A"'
+server.sendall(part)
+assert parser.drain(stream, buffer) == len(part) and not events, 'event completed before its blank line'
+server.sendall(b'}\n\n')
+parser.drain(stream, buffer)
+assert events == [('departure', '{"stop": "A"}')], events
+
+server.sendall(b''.join(b'data: %d\n\n' % i for i in range(100)))
+time.sleep(0.05)
+parser.drain(stream, buffer)
+assert [data for _, data in events[1:]] == [str(i) for i in range(100)], 'events spanning several buffers'
+
+server.close()
+try:
+    parser.drain(stream, buffer)
+except OSError:
+    pass
+else:
+    raise AssertionError('closed stream not reported')
+device.close()
+print(f'check ok: keep-alive read short, {len(events)} events delivered, close detected')
@@ -0,0 +1,125 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#
+# Copyright (c) 2026 Leander Sabel
+# Licensed under the MIT License. See LICENSE
+#
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'pico'))
+
+import config.settings
+from lib.planner import compile_routes
+from lib.sources import GTFSRealtimeSource
+
+STATION, STOP, OFFSET = 'Zürich, Paradeplatz', '8591299', 7200
+LINES = {'r2': {0: ('T', '2', 'Schlieren, Geissweid'), 1: ('T', '2', 'Zürich, Tiefenbrunnen')},
+         'r13': {0: ('T', '13', 'Zürich, Albisgütli')}}
+# TripDescriptor.schedule_relationship CANCELED, StopTimeUpdate.schedule_relationship SKIPPED.
+CANCELED, SKIPPED = 3, 1
+
+parser = argparse.ArgumentParser(prog="GTFS-RT decoding check")
+parser.add_argument("-c", "--chunk", type=int, default=512, help="Bytes read from the file per call, like api_read_chunk")
+parser.add_argument("-o", "--out", type=str, help="Directory to keep the stand-in trip_updates.pb in")
+args = parser.parse_args()
+
+
+def varint(value):
+    out = bytearray()
+    while True:
+        byte, value = value & 0x7f, value >> 7
+        out.append(byte | (0x80 if value else 0))
+        if not value:
+            return bytes(out)
+
+
+def field(number, value):
+    """Encodes one protobuf field: int as varint, bytes or str as length-delimited."""
+    if isinstance(value, int):
+        return varint(number << 3) + varint(value)
+    value = value.encode() if isinstance(value, str) else value
+    return varint(number << 3 | 2) + varint(len(value)) + value
+
+
+def event(time=None, delay=None):
+    """Encodes a StopTimeEvent with an absolute time, a delay, or both."""
+    return (field(1, delay) if delay is not None else b'') + (field(2, time) if time is not None else b'')
+
+
+def stop_update(stop_id, departure=None, arrival=None, skipped=False):
+    update = field(4, stop_id)
+    if arrival is not None:
+        update += field(2, arrival)
+    if departure is not None:
+        update += field(3, departure)
+    if skipped:
+        update += field(5, SKIPPED)
+    return field(2, update)
+
+
+def trip(number, route, direction, updates, canceled=False):
+    descriptor = field(1, f'trip-{number}') + field(5, route) + field(6, direction)
+    if canceled:
+        descriptor += field(4, CANCELED)
+    return field(2, field(1, f'e{number}') + field(3, field(1, descriptor) + b''.join(updates)))
+
+
+def stand_in(now):
+    """Returns a feed with one trip per case, and the (line, destination, epoch) departures it must yield."""
+    other = '8503000'
+    trips = [
+        # Departure time at the stop, after a stop elsewhere.
+        trip(1, 'r2', 0, [stop_update(other, event(now + 60)), stop_update(STOP, event(now + 300))]),
+        # Platform ID of the stop, and a departure that takes precedence over the arrival.
+        trip(2, 'r2', 1, [stop_update(f'{STOP}:0:3', event(now + 620), event(now + 600))]),
+        # Arrival only, as at the last stop of a trip.
+        trip(3, 'r13', 0, [stop_update(STOP, arrival=event(now + 900))]),
+        # Skipped at the stop, served elsewhere.
+        trip(4, 'r2', 0, [stop_update(STOP, event(now + 420), skipped=True), stop_update(other, event(now + 480))]),
+        # Canceled trip.
+        trip(5, 'r13', 0, [stop_update(STOP, event(now + 540))], canceled=True),
+        # Departure already gone.
+        trip(6, 'r2', 0, [stop_update(STOP, event(now - 60))]),
+        # Delay without a time: the scheduled time it applies to is not in the feed.
+        trip(7, 'r2', 1, [stop_update(STOP, event(delay=120))]),
+        # Route not configured in gtfs_rt_routes.
+        trip(8, 'r99', 0, [stop_update(STOP, event(now + 360))]),
+        # Direction not configured for the route.
+        trip(9, 'r13', 1, [stop_update(STOP, event(now + 720))]),
+    ]
+    expected = [(('T', '2', 'Schlieren, Geissweid'), now + 300), (('T', '2', 'Zürich, Tiefenbrunnen'), now + 620),
+                (('T', '13', 'Zürich, Albisgütli'), now + 900)]
+    return field(1, field(1, '2.0') + field(3, now)) + b''.join(trips), expected
+
+
+now = int(time.time())
+config.settings.gtfs_rt_stops = {STATION: [STOP]}
+config.settings.gtfs_rt_routes = LINES
+feed, expected = stand_in(now)
+with tempfile.TemporaryDirectory() as scratch:
+    directory = Path(args.out or scratch)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / 'trip_updates.pb').write_bytes(feed)
+
+    source = GTFSRealtimeSource(lambda epoch: OFFSET)
+    station = {'name': STATION, 'rows': 4, 'thresholds': {}, 'monitored_connections': [], 'filter': compile_routes(None)}
+    results = {STATION: []}
+    decoder = source.decoder([station], results, now)
+    buffer = bytearray(args.chunk)
+    view = memoryview(buffer)
+    with open(directory / 'trip_updates.pb', 'rb', buffering=0) as stream:
+        while n := stream.readinto(buffer):
+            decoder.feed(view[:n])
+
+decoded = sorted(((c.category, c.number, c.to), c.epoch) for c in results[STATION])
+assert decoded == sorted(expected), f'decoded {decoded}, expected {sorted(expected)}'
+for c in results[STATION]:
+    local = time.gmtime(c.epoch + OFFSET)
+    assert c.departure == f'{local.tm_hour:02d}:{local.tm_min:02d}', (c.departure, c.epoch)
+print(f'check ok: {len(decoded)} departures from {feed.count(b"trip-")} trips; skipped, canceled, past, '
+      f'delay-only and unknown routes dropped')
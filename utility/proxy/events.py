@@ -0,0 +1,69 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#
+# Copyright (c) 2026 Leander Sabel
+# Licensed under the MIT License. See LICENSE
+#
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import json
+import queue
+import threading
+import time
+
+
+def departure_event(name, category, number, to, departure, epoch):
+    """Returns the event sent when the prognosis of a departure changes; sent is the server time in ms."""
+    return {'stop': name, 'category': category, 'number': number, 'to': to, 'departure': departure,
+            'epoch': epoch, 'sent': int(time.time() * 1000)}
+
+
+class Broker:
+    """Fans departure events out to the server-sent-events connections following their stop."""
+
+    def __init__(self, keepalive=15):
+        self.keepalive = keepalive
+        self.subscribers = []
+        self.guard = threading.Lock()
+        self.stats = {'subscribers': 0, 'published': 0, 'delivered': 0}
+
+    def watched(self):
+        """Returns the names of all stops someone follows."""
+        with self.guard:
+            return set().union(*(names for names, _ in self.subscribers))
+
+    def publish(self, event):
+        """Queues an event for every subscriber following its stop."""
+        with self.guard:
+            self.stats['published'] += 1
+            for names, events in self.subscribers:
+                if event['stop'] in names:
+                    events.put(event)
+
+    def stream(self, handler, names):
+        """Answers a request with an event stream until the client disconnects."""
+        events = queue.Queue()
+        with self.guard:
+            self.subscribers.append((set(names), events))
+            self.stats['subscribers'] = len(self.subscribers)
+        try:
+            handler.send_response(200)
+            handler.send_header('Content-Type', 'text/event-stream')
+            handler.send_header('Cache-Control', 'no-cache')
+            handler.end_headers()
+            handler.wfile.write(b': connected\n\n')
+            handler.wfile.flush()
+            while True:
+                try:
+                    event = events.get(timeout=self.keepalive)
+                    handler.wfile.write(f'event: departure\ndata: {json.dumps(event)}\n\n'.encode())
+                    with self.guard:
+                        self.stats['delivered'] += 1
+                except queue.Empty:
+                    handler.wfile.write(b': keepalive\n\n')
+                handler.wfile.flush()
+        except OSError:
+            pass
+        finally:
+            with self.guard:
+                self.subscribers = [s for s in self.subscribers if s[1] is not events]
+                self.stats['subscribers'] = len(self.subscribers)
@@ -0,0 +1,112 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#
+# Copyright (c) 2026 Leander Sabel
+# Licensed under the MIT License. See LICENSE
+#
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'pico'))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from lib.protocol import BoardReader
+
+SPAWN = "Start the stand-in API and the proxy in this process.\nWithout it, --proxy and --standin must be running"
+
+parser = argparse.ArgumentParser(prog="Tramwise proxy load generator", formatter_class=argparse.RawTextHelpFormatter)
+parser.add_argument("-d", "--devices", type=int, default=300, help="Boards to emulate")
+parser.add_argument("-s", "--stations", type=int, default=40, help="Distinct stops shared by all boards")
+parser.add_argument("-k", "--per-device", type=int, default=3, help="Stops per board")
+parser.add_argument("-i", "--interval", type=float, default=5, help="Seconds between polls of one board")
+parser.add_argument("-t", "--duration", type=float, default=30, help="Seconds to run")
+parser.add_argument("-r", "--rows", type=int, default=12, help="Rows per stop, like proxy_rows_per_stop")
+parser.add_argument("--proxy", type=str, default="http://127.0.0.1:8080/v1/", help="Proxy base URL")
+parser.add_argument("--standin", type=str, default="http://127.0.0.1:8081/v1/", help="Stand-in API base URL")
+parser.add_argument("--delay", type=float, default=0.2, help="Stand-in answer delay in seconds, with --spawn")
+parser.add_argument("--spawn", action="store_true", help=SPAWN)
+args = parser.parse_args()
+
+
+async def device(number, stops, host, port, base, deadline, latencies, sizes, errors):
+    """Polls the board of one emulated device until the deadline, like ProxySource over HTTP/1.0."""
+    query = '&'.join(f's={urllib.parse.quote(name)}' for name in stops)
+    request = f'GET {base}board?limit={args.rows}&{query} HTTP/1.0\r\nHost: {host}\r\n\r\n'.encode()
+    record = bytearray(4096)
+    await asyncio.sleep(random.random() * args.interval)
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        rows = []
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(request)
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            head, _, body = response.partition(b'\r\n\r\n')
+            if b' 200 ' not in head.split(b'\r\n', 1)[0]:
+                raise ValueError(head[:40])
+            decoder = BoardReader(record, lambda *row: rows.append(row))
+            decoder.feed(body)
+            if not decoder.complete or not rows:
+                raise ValueError('truncated record')
+            latencies.append(time.perf_counter() - start)
+            sizes.append(len(body))
+        except (OSError, ValueError) as e:
+            errors.append(f'device {number}: {e}')
+        await asyncio.sleep(args.interval)
+
+
+def fetch_json(url):
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))] if values else float('nan')
+
+
+async def run():
+    rng = random.Random(7)
+    pool = [f'Stop {i:03d}' for i in range(args.stations)]
+    url = urllib.parse.urlsplit(args.proxy)
+    latencies, sizes, errors = [], [], []
+    deadline = time.monotonic() + args.duration
+    await asyncio.gather(*(device(n, rng.sample(pool, args.per_device), url.hostname, url.port or 80, url.path,
+                                  deadline, latencies, sizes, errors) for n in range(args.devices)))
+    return latencies, sizes, errors
+
+
+if args.spawn:
+    from server import StopCache, serve
+    from standin import StandIn
+    upstream = StandIn(args.delay).serve('127.0.0.1', 0)
+    args.standin = f'http://127.0.0.1:{upstream.server_address[1]}/v1/'
+    proxy = serve('127.0.0.1', 0, StopCache(args.standin, 40, 15, 120, 10))
+    args.proxy = f'http://127.0.0.1:{proxy.server_address[1]}/v1/'
+
+latencies, sizes, errors = asyncio.run(run())
+proxy_stats = fetch_json(args.proxy + 'stats')
+standin_stats = fetch_json(args.standin + 'stats')
+
+print(f'{args.devices} devices, {args.per_device} of {args.stations} stops each, every {args.interval:g} s '
+      f'for {args.duration:g} s')
+print(f'responses      {len(latencies):8d} ok {len(errors):8d} failed')
+print(f'latency        p50 {percentile(latencies, 50) * 1e3:7.1f} ms  p95 {percentile(latencies, 95) * 1e3:7.1f} ms'
+      f'  p99 {percentile(latencies, 99) * 1e3:7.1f} ms  max {max(latencies, default=0) * 1e3:7.1f} ms')
+if sizes:
+    direct = standin_stats['bytes'] / max(1, standin_stats['requests']) * args.per_device
+    print(f'bytes/response {sum(sizes) / len(sizes):8.0f} packed  vs {direct:8.0f} JSON for the same stops direct')
+print(f'upstream       {standin_stats["requests"]:8d} fetches for {proxy_stats["device_requests"]} device requests'
+      f' ({proxy_stats["device_requests"] * args.per_device} stop lookups, {proxy_stats["hits"]} cache hits)')
+for error in errors[:5]:
+    print('  ' + error)
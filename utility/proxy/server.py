@@ -0,0 +1,236 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#
+# Copyright (c) 2026 Leander Sabel
+# Licensed under the MIT License. See LICENSE
+#
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import argparse
+import json
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'pico'))
+
+from events import Broker, departure_event
+from lib.protocol import pack_board
+
+FIELDS = ('stationboard/category', 'stationboard/number', 'stationboard/to',
+          'stationboard/stop/departure', 'stationboard/stop/prognosis/departure')
+
+UPSTREAM = "Base URL of the stationboard API.\nDefaults to https://transport.opendata.ch/v1/"
+STATIONS = "Station configuration to render frames for at /v1/frame (see utility/render).\nFrames are not served without it"
+WATCH = "Seconds between upstream fetches of stops followed at /v1/events.\nDefaults to --min-ttl"
+TTL = "Seconds a stop's departures are served from cache, clamped to the time until its next departure"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="Tramwise aggregation proxy", formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("-u", "--upstream", type=str, default="https://transport.opendata.ch/v1/", help=UPSTREAM)
+    parser.add_argument("-H", "--host", type=str, default="0.0.0.0", help="Address to listen on")
+    parser.add_argument("-p", "--port", type=int, default=8080, help="Port to listen on")
+    parser.add_argument("-l", "--limit", type=int, default=40, help="Departures requested per stop upstream")
+    parser.add_argument("--min-ttl", type=int, default=15, help=TTL + " (lower bound)")
+    parser.add_argument("--max-ttl", type=int, default=120, help=TTL + " (upper bound)")
+    parser.add_argument("--timeout", type=float, default=10, help="Upstream request timeout in seconds")
+    parser.add_argument("-s", "--stations", type=str, help=STATIONS)
+    parser.add_argument("-w", "--watch", type=int, help=WATCH)
+    return parser.parse_args(argv)
+
+
+def departure(entry):
+    """Returns (epoch, category, number, to, HH:MM) of a stationboard entry, using the prognosis if there is one."""
+    stop = entry['stop']
+    iso = (stop.get('prognosis') or {}).get('departure') or stop['departure']
+    epoch = int(datetime.strptime(iso, '%Y-%m-%dT%H:%M:%S%z').timestamp())
+    return epoch, entry['category'] or '', entry['number'] or '', entry['to'] or '', iso[11:16]
+
+
+def trip(entry):
+    """Returns the key identifying the trip of a stationboard entry across fetches."""
+    return entry['category'] or '', entry['number'] or '', entry['to'] or '', entry['stop']['departure']
+
+
+class StopCache:
+    """Departures per stop, fetched upstream once for all devices and kept until their next departure leaves.
+
+    Concurrent requests for a stop that has to be refreshed wait for a single upstream fetch. With a broker,
+    every fetch is compared with the previous one and a departure event is published per changed prognosis.
+    """
+
+    def __init__(self, upstream, limit, min_ttl, max_ttl, timeout, broker=None):
+        self.upstream = upstream.rstrip('/') + '/stationboard'
+        self.limit, self.min_ttl, self.max_ttl, self.timeout = limit, min_ttl, max_ttl, timeout
+        self.entries = {}
+        self.locks = {}
+        self.trips = {}
+        self.broker = broker
+        self.guard = threading.Lock()
+        self.stats = {'device_requests': 0, 'upstream_fetches': 0, 'upstream_failures': 0, 'upstream_bytes': 0,
+                      'hits': 0, 'bytes_out': 0, 'changes': 0}
+
+    def get(self, name, now):
+        """Returns the departures of a stop still to leave, fetching them if the cached ones expired."""
+        entry = self.entries.get(name)
+        if entry is None or entry[0] <= now:
+            with self.__lock(name):
+                entry = self.entries.get(name)
+                if entry is None or entry[0] <= now:
+                    entry = self.__fetch(name, entry, now)
+                else:
+                    self.count('hits')
+        else:
+            self.count('hits')
+        return [d for d in entry[1] if d[0] >= now]
+
+    def refresh(self, name, now, max_age=0):
+        """Fetches the departures of a stop unless a successful fetch is at most max_age seconds old."""
+        with self.__lock(name):
+            entry = self.entries.get(name)
+            if entry is None or not entry[3] or now - entry[2] >= max_age:
+                self.__fetch(name, entry, now)
+
+    def watch(self, interval):
+        """Refreshes the stops followed at the broker every interval seconds, on a background thread."""
+        def __run():
+            attempted = {}
+            while True:
+                now = int(time.time())
+                for name in self.broker.watched():
+                    if now - attempted.get(name, 0) >= interval:
+                        attempted[name] = now
+                        self.refresh(name, now, interval)
+                time.sleep(1)
+
+        threading.Thread(target=__run, daemon=True).start()
+
+    def status(self, name, now):
+        """Returns (ok, age): whether the last upstream fetch of a stop succeeded, and the age of its departures."""
+        entry = self.entries.get(name)
+        if entry is None or entry[2] is None:
+            return entry is None or entry[3], None
+        return entry[3], now - entry[2]
+
+    def count(self, key, n=1):
+        with self.guard:
+            self.stats[key] += n
+
+    def __lock(self, name):
+        with self.guard:
+            return self.locks.setdefault(name, threading.Lock())
+
+    def __fetch(self, name, stale, now):
+        query = urllib.parse.urlencode([('station', name), ('limit', self.limit)] + [('fields[]', f) for f in FIELDS])
+        self.count('upstream_fetches')
+        try:
+            with urllib.request.urlopen(f'{self.upstream}?{query}', timeout=self.timeout) as response:
+                body = response.read()
+            trips = {trip(e): departure(e) for e in json.loads(body).get('stationboard') or ()}
+            departures = sorted(trips.values())
+            self.count('upstream_bytes', len(body))
+        except (OSError, ValueError, KeyError, TypeError):
+            self.count('upstream_failures')
+            # Serve the last good departures, if any, and retry after the shortest TTL.
+            departures, fetched = (stale[1], stale[2]) if stale else ([], None)
+            entry = self.entries[name] = (now + self.min_ttl, departures, fetched, False)
+            return entry
+        self.__publish(name, self.trips.get(name), trips)
+        self.trips[name] = trips
+        upcoming = [d[0] for d in departures if d[0] > now]
+        ttl = min(self.max_ttl, max(self.min_ttl, upcoming[0] - now if upcoming else self.max_ttl))
+        entry = self.entries[name] = (now + ttl, departures, now, True)
+        return entry
+
+    def __publish(self, name, previous, trips):
+        if self.broker is None or previous is None:
+            return
+        for key, (epoch, category, number, to, hhmm) in trips.items():
+            if key in previous and previous[key][0] != epoch:
+                self.count('changes')
+                self.broker.publish(departure_event(name, category, number, to, hhmm, epoch))
+
+
+def make_handler(cache, renderer=None):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            url = urllib.parse.urlsplit(self.path)
+            query = urllib.parse.parse_qs(url.query)
+            if url.path == '/v1/board' and query.get('s'):
+                cache.count('device_requests')
+                now = int(time.time())
+                limit = int(query.get('limit', ['12'])[0])
+                body = pack_board([(name, cache.get(name, now)[:limit]) for name in query['s']])
+                cache.count('bytes_out', len(body))
+                self.__reply(200, 'application/octet-stream', body)
+            elif url.path == '/v1/frame' and renderer and renderer.names(query.get('c', [''])[0]) is not None:
+                key = query['c'][0]
+                cache.count('device_requests')
+                now = int(time.time())
+                names = renderer.names(key)
+                departures = {name: cache.get(name, now) for name in names}
+                status = [cache.status(name, now) for name in names]
+                ages = [age for ok, age in status if not ok and age is not None]
+                body = renderer.frame(key, departures, now, all(ok for ok, _ in status), max(ages) if ages else None)
+                cache.count('bytes_out', len(body))
+                self.__reply(200, 'application/octet-stream', body)
+            elif url.path == '/v1/events' and query.get('s') and cache.broker:
+                # Streams until the device disconnects; its connection is not reused for other requests.
+                self.close_connection = True
+                cache.broker.stream(self, query['s'])
+            elif url.path == '/v1/stats':
+                stats = dict(cache.stats)
+                if renderer:
+                    stats['render'] = renderer.stats
+                if cache.broker:
+                    stats['events'] = cache.broker.stats
+                self.__reply(200, 'application/json', json.dumps(stats).encode())
+            else:
+                self.__reply(404, 'text/plain', b'not found')
+
+        def __reply(self, status, content_type, body):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def load_renderer(stations_file):
+    """Returns a FrameRenderer for the station configuration; imported on demand as it loads the fonts."""
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'render'))
+    from renderer import FrameRenderer
+    return FrameRenderer(stations_file)
+
+
+def serve(host, port, cache, renderer=None):
+    """Starts the proxy on a background thread and returns the server."""
+    server = ThreadingHTTPServer((host, port), make_handler(cache, renderer))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    cache = StopCache(args.upstream, args.limit, args.min_ttl, args.max_ttl, args.timeout, Broker())
+    cache.watch(args.watch or args.min_ttl)
+    renderer = load_renderer(args.stations) if args.stations else None
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(cache, renderer))
+    print(f'Serving boards on {args.host}:{args.port} from {args.upstream}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,157 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#
+# Copyright (c) 2026 Leander Sabel
+# Licensed under the MIT License. See LICENSE
+#
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.parse
+import zlib
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from events import Broker, departure_event
+
+ZONE = timezone(timedelta(hours=2))
+LINES = [('T', '2', 'Schlieren, Geissweid'), ('T', '2', 'Zürich, Tiefenbrunnen'), ('T', '13', 'Frankental'),
+         ('T', '13', 'Zürich, Albisgütli'), ('B', '33', 'Zürich, Morgental'), ('B', '72', 'Zürich, Milchbuck')]
+
+
+def iso(epoch):
+    return datetime.fromtimestamp(epoch, ZONE).strftime('%Y-%m-%dT%H:%M:%S%z')
+
+
+def departures(name, limit, now, delays=None):
+    """Returns a deterministic timetable for any stop: every line departs every 6 to 11 minutes.
+
+    Departures are (scheduled epoch, category, number, to, delay in seconds), sorted by scheduled time;
+    delays maps (category, number, to, scheduled epoch) to injected extra delays.
+    """
+    seed = zlib.crc32(name.encode())
+    result = []
+    for i, (category, number, to) in enumerate(LINES):
+        period = 360 + (seed >> i) % 6 * 60
+        first = now - now % period + (seed >> 8 + i) % period
+        for k in range(limit):
+            epoch = first + k * period
+            delay = 60 if (epoch // period + i) % 5 == 0 else 0
+            delay += (delays or {}).get((category, number, to, epoch), 0)
+            result.append((epoch, category, number, to, delay))
+    result.sort()
+    return result[:limit]
+
+
+def stationboard(name, limit, now, delays=None):
+    """Returns the stationboard JSON of a stop."""
+    return {'stationboard': [{'category': category, 'number': number, 'to': to,
+                              'stop': {'departure': iso(epoch),
+                                       'prognosis': {'departure': iso(epoch + delay) if delay else None}}}
+                             for epoch, category, number, to, delay in departures(name, limit, now, delays)]}
+
+
+class StandIn:
+    """Synthetic transport.opendata.ch stationboard endpoint that counts what it serves.
+
+    It also stands in for the update endpoint of the proxy: delays injected with inject, or at /v1/delay,
+    show up on its stationboards and are pushed at once to the event streams at /v1/events following the stop.
+    """
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.guard = threading.Lock()
+        self.delays = {}
+        self.broker = Broker()
+        self.stats = {'requests': 0, 'bytes': 0, 'stations': {}}
+
+    def inject(self, name, seconds, now=None):
+        """Delays the first departure of a stop leaving in two minutes or later, returns the published event."""
+        now = now or int(time.time())
+        with self.guard:
+            delays = self.delays.setdefault(name, {})
+            epoch, category, number, to, delay = next(d for d in departures(name, 40, now, delays)
+                                                      if d[0] + d[4] >= now + 120)
+            key = (category, number, to, epoch)
+            delays[key] = delays.get(key, 0) + seconds
+        event = departure_event(name, category, number, to, iso(epoch + delay + seconds)[11:16], epoch + delay + seconds)
+        self.broker.publish(event)
+        return event
+
+    def changes(self, interval, seconds=120):
+        """Injects a delay at a random followed stop every interval seconds, on a background thread."""
+        def __run():
+            while True:
+                time.sleep(interval)
+                watched = sorted(self.broker.watched())
+                if watched:
+                    self.inject(random.choice(watched), seconds)
+
+        threading.Thread(target=__run, daemon=True).start()
+
+    def handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urllib.parse.urlsplit(self.path)
+                query = urllib.parse.parse_qs(url.query)
+                if url.path.endswith('/stationboard') and query.get('station'):
+                    name = query['station'][0]
+                    with standin.guard:
+                        delays = dict(standin.delays.get(name, {}))
+                    limit = int(query.get('limit', ['40'])[0])
+                    body = json.dumps(stationboard(name, limit, int(time.time()), delays)).encode()
+                    with standin.guard:
+                        standin.stats['requests'] += 1
+                        standin.stats['bytes'] += len(body)
+                        standin.stats['stations'][name] = standin.stats['stations'].get(name, 0) + 1
+                    time.sleep(standin.delay)
+                    status = 200
+                elif url.path.endswith('/events') and query.get('s'):
+                    standin.broker.stream(self, query['s'])
+                    return
+                elif url.path.endswith('/delay') and query.get('station'):
+                    event = standin.inject(query['station'][0], int(query.get('seconds', ['120'])[0]))
+                    body, status = json.dumps(event).encode(), 200
+                elif url.path.endswith('/stats'):
+                    body, status = json.dumps(standin.stats).encode(), 200
+                else:
+                    body, status = b'{}', 404
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def serve(self, host, port):
+        """Starts the stand-in on a background thread and returns the server."""
+        server = ThreadingHTTPServer((host, port), self.handler())
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog="Stand-in stationboard API")
+    parser.add_argument("-p", "--port", type=int, default=8081, help="Port to listen on")
+    parser.add_argument("-d", "--delay", type=float, default=0.2, help="Seconds each stationboard takes to answer")
+    parser.add_argument("-c", "--changes", type=float, help="Inject a delay at a followed stop every this many seconds")
+    args = parser.parse_args()
+    standin = StandIn(args.delay)
+    if args.changes:
+        standin.changes(args.changes)
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), standin.handler())
+    print(f'Stand-in API on http://127.0.0.1:{args.port}/v1/')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
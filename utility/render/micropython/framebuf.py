@@ -0,0 +1,76 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#
+# Copyright (c) 2026 Leander Sabel
+# Licensed under the MIT License. See LICENSE
+#
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# CPython implementation of the monochrome part of MicroPython's framebuf module,
+# as far as pico/lib/layout.py and pico/lib/writer.py use it.
+
+MONO_VLSB = 0
+MONO_HLSB = 3
+MONO_HMSB = 4
+
+
+class FrameBuffer:
+
+    def __init__(self, buffer, width, height, format, stride=None):
+        if format not in (MONO_VLSB, MONO_HLSB, MONO_HMSB):
+            raise ValueError('Only monochrome formats are supported')
+        self.buffer = buffer
+        self.width, self.height, self.format = width, height, format
+        self.stride = stride or width
+
+    def __index(self, x, y):
+        if self.format == MONO_VLSB:
+            return (y >> 3) * self.stride + x, y & 7
+        offset = (y * ((self.stride + 7) & ~7) + x) >> 3
+        return offset, 7 - (x & 7) if self.format == MONO_HLSB else x & 7
+
+    def pixel(self, x, y, c=None):
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        offset, bit = self.__index(x, y)
+        if c is None:
+            return self.buffer[offset] >> bit & 1
+        if c & 1:
+            self.buffer[offset] |= 1 << bit
+        else:
+            self.buffer[offset] &= ~(1 << bit) & 0xff
+
+    def fill(self, c):
+        self.buffer[:] = (b'\xff' if c & 1 else b'\x00') * len(self.buffer)
+
+    def fill_rect(self, x, y, w, h, c):
+        for yy in range(max(0, y), min(self.height, y + h)):
+            for xx in range(max(0, x), min(self.width, x + w)):
+                self.pixel(xx, yy, c)
+
+    def hline(self, x, y, w, c):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self.fill_rect(x, y, 1, h, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        if f:
+            self.fill_rect(x, y, w, h, c)
+        else:
+            self.hline(x, y, w, c)
+            self.hline(x, y + h - 1, w, c)
+            self.vline(x, y, h, c)
+            self.vline(x + w - 1, y, h, c)
+
+    def blit(self, fbuf, x, y, key=-1, palette=None):
+        """Copies fbuf with its top left corner at x, y, skipping pixels of colour key."""
+        if palette is not None:
+            raise NotImplementedError('Palettes are not supported')
+        for sy in range(max(0, -y), min(fbuf.height, self.height - y)):
+            for sx in range(max(0, -x), min(fbuf.width, self.width - x)):
+                c = fbuf.pixel(sx, sy)
+                if c != key:
+                    self.pixel(x + sx, y + sy, c)
+
+    def scroll(self, xstep, ystep):
+        raise NotImplementedError('Scrolling is not supported')
@@ -0,0 +1,17 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#
+# Copyright (c) 2026 Leander Sabel
+# Licensed under the MIT License. See LICENSE
+#
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# CPython has no raw memory access; pico/lib/writer.py imports these for CWriter only,
+# which the board layout does not use.
+
+
+def addressof(obj):
+    raise NotImplementedError('uctypes is not available under CPython')
+
+
+def bytearray_at(address, size):
+    raise NotImplementedError('uctypes is not available under CPython')
@@ -0,0 +1,126 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#
+# Copyright (c) 2026 Leander Sabel
+# Licensed under the MIT License. See LICENSE
+#
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import argparse
+import runpy
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / 'pico'))
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'micropython'))
+
+from framebuf import FrameBuffer, MONO_VLSB
+
+from config import settings
+from lib.board import BoardStore, classify
+from lib.data import Connection
+from lib.layout import BoardLayout
+from lib.planner import compile_routes
+from lib.protocol import pack_frame
+
+
+class FrameRenderer:
+    """Renders the boards of station configurations into the panel's two RAM images under CPython.
+
+    The board is built and drawn by the same code as on the device (BoardStore, classify, BoardLayout);
+    the canvas is then blitted into MONO_VLSB buffers laid out like the EinkPIO buffers at rotation 90,
+    so the device copies them unchanged and its PIO reverses the bits on the way to the panel.
+    """
+
+    def __init__(self, stations_file, display_type=None):
+        self.configurations = runpy.run_path(stations_file)['configurations']
+        self.params = settings.display_parameters[display_type or settings.active_display]
+        width, height = self.params['display_width'], self.params['display_height']
+        self.layout = BoardLayout(self.params)
+        self.board = BoardStore(settings.board_max_rows, settings.board_max_stations)
+        self.bw = bytearray(width * height // 8)
+        self.red = bytearray(width * height // 8)
+        self.panel = FrameBuffer(self.bw, width, height, MONO_VLSB)
+        self.frames = {}
+        self.lock = threading.Lock()
+        self.stats = {'renders': 0, 'reuses': 0, 'render_ms': None, 'frame_bytes': None}
+
+    def names(self, key):
+        """Returns the stop names of a configuration, or None if it does not exist."""
+        stations = self.configurations.get(key)
+        return None if stations is None else [station['name'] for station in stations]
+
+    def frame(self, key, departures, now, api_ok=True, stale_age=None):
+        """Returns the packed frame of a configuration, rendering it only if its board changed.
+
+        departures maps each stop name to (epoch, category, number, to, HH:MM) tuples.
+        """
+        with self.lock:
+            self.__fill(self.configurations[key], departures, now)
+            signature = self.layout.signature(self.board, True, api_ok, stale_age)
+            cached = self.frames.get(key)
+            if cached and cached[0] == signature:
+                self.stats['reuses'] += 1
+                return cached[1]
+            start = time.perf_counter()
+            self.layout.draw_board(self.board, True, api_ok, stale_age)
+            self.panel.fill(1)
+            self.panel.blit(self.layout.canvas, 0, 0)
+            # TransportDisplay blits the canvas into both RAMs, so the red image is always a copy.
+            self.red[:] = self.bw
+            frame = pack_frame(self.bw, self.red)
+            self.frames[key] = (signature, frame)
+            self.stats['renders'] += 1
+            self.stats['render_ms'] = round((time.perf_counter() - start) * 1e3)
+            self.stats['frame_bytes'] = len(frame)
+            return frame
+
+    def __fill(self, stations, departures, now):
+        board = self.board
+        board.clear()
+        for station in stations:
+            if not board.begin(station['name']):
+                continue
+            thresholds = station['thresholds']
+            connections = (Connection.scheduled(category, number, to, epoch, departure, thresholds)
+                           for epoch, category, number, to, departure in departures.get(station['name'], ()))
+            routes = compile_routes(station.get('monitored_connections'))
+            for connection, mtd, flags in classify(connections, routes, thresholds, now):
+                board.offer(connection, mtd, flags, station['rows'])
+
+
+def write_pbm(path, canvas):
+    """Writes the canvas as a binary PBM image for previewing."""
+    pixels = bytes(0xff & ~b for b in canvas._buf)
+    Path(path).write_bytes(f'P4\n{canvas.width} {canvas.height}\n'.encode() + pixels)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog="Tramwise frame renderer")
+    parser.add_argument("key", type=str, help="Configuration to render")
+    parser.add_argument("-s", "--stations", type=str, default=str(ROOT / 'pico' / 'config' / 'stations.py'),
+                        help="Station configuration, defaults to pico/config/stations.py")
+    parser.add_argument("-u", "--upstream", type=str, default="https://transport.opendata.ch/v1/",
+                        help="Stationboard API base URL")
+    parser.add_argument("--standin", action="store_true", help="Render against the stand-in API of utility/proxy")
+    parser.add_argument("-o", "--out", type=str, default="frame.pbm", help="Preview image to write")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(ROOT / 'utility' / 'proxy'))
+    from server import StopCache
+    if args.standin:
+        from standin import StandIn
+        args.upstream = f'http://127.0.0.1:{StandIn().serve("127.0.0.1", 0).server_address[1]}/v1/'
+
+    renderer = FrameRenderer(args.stations)
+    if renderer.names(args.key) is None:
+        sys.exit(f'No configuration named {args.key}')
+    cache = StopCache(args.upstream, 40, 15, 120, 10)
+    now = int(time.time())
+    departures = {name: cache.get(name, now) for name in renderer.names(args.key)}
+    frame = renderer.frame(args.key, departures, now)
+    write_pbm(args.out, renderer.layout.canvas)
+    print(f'{args.out}: {len(renderer.bw) + len(renderer.red)} bytes of panel RAM sent as a {len(frame)} byte frame, '
+          f'rendered in {renderer.stats["render_ms"]} ms')
@@ -0,0 +1,172 @@
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#
+# Copyright (c) 2026 Leander Sabel
+# Licensed under the MIT License. See LICENSE
+#
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import argparse
+import csv
+import io
+import runpy
+import struct
+import zipfile
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+# Must match pico/lib/timetable.py
+MAGIC, VERSION = b'TWTT', 1
+HEADER, ZONE, ROUTE = '<4sBHHHI', '<ih', '<4H8I'
+
+# GTFS route_type to the API category, used when a feed leaves route_desc empty.
+ROUTE_TYPES = {0: 'T', 1: 'M', 2: 'R', 3: 'B', 4: 'BAT', 5: 'SL', 6: 'GB', 7: 'FUN',
+               100: 'R', 106: 'R', 109: 'S', 400: 'M', 700: 'B', 900: 'T', 1000: 'BAT', 1300: 'GB', 1400: 'FUN'}
+
+STATIONS = "Station configuration to compile the routes of.\nDefaults to pico/config/stations.py"
+WEEK = "A date in the week whose services are compiled (YYYY-MM-DD).\nDefaults to today"
+
+parser = argparse.ArgumentParser(prog="GTFS timetable index compiler", formatter_class=argparse.RawTextHelpFormatter)
+parser.add_argument("source", type=str, help="GTFS feed, as a .zip file or an extracted directory")
+parser.add_argument("target", type=str, nargs="?", default="timetable.bin", help="Index file to write")
+parser.add_argument("-s", "--stations", type=str,
+                    default=str(Path(__file__).resolve().parents[2] / 'pico' / 'config' / 'stations.py'), help=STATIONS)
+parser.add_argument("-w", "--week", type=date.fromisoformat, default=date.today(), help=WEEK)
+parser.add_argument("-y", "--years", type=int, default=2, help="Years of UTC offset changes to include")
+
+
+def open_feed(source):
+    """Returns a function that iterates the rows of a GTFS table as dicts."""
+    if zipfile.is_zipfile(source):
+        archive = zipfile.ZipFile(source)
+
+        def rows(name):
+            with archive.open(name) as f:
+                yield from csv.DictReader(io.TextIOWrapper(f, 'utf-8-sig'))
+    else:
+        def rows(name):
+            with open(Path(source) / name, encoding='utf-8-sig', newline='') as f:
+                yield from csv.DictReader(f)
+    return rows
+
+
+def monitored_routes(stations_file):
+    """Returns {station name: set of (category, number, to) or None for all routes} over all configurations."""
+    configurations = runpy.run_path(stations_file)['configurations']
+    wanted = {}
+    for stations in configurations.values():
+        for station in stations:
+            monitored = station.get('monitored_connections')
+            if not monitored:
+                wanted[station['name']] = None
+            elif wanted.get(station['name'], set()) is not None:
+                wanted.setdefault(station['name'], set()).update(
+                    (c['category'], c['number'], c['to']) for c in monitored)
+    return wanted
+
+
+def week_services(rows, week):
+    """Returns the service IDs running on each day Monday..Sunday of the week containing week."""
+    monday = week - timedelta(days=week.weekday())
+    days = [monday + timedelta(days=i) for i in range(7)]
+    names = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+    services = [set() for _ in days]
+    try:
+        for row in rows('calendar.txt'):
+            start, end = (datetime.strptime(row[k], '%Y%m%d').date() for k in ('start_date', 'end_date'))
+            for i, day in enumerate(days):
+                if start <= day <= end and row[names[i]] == '1':
+                    services[i].add(row['service_id'])
+    except (FileNotFoundError, KeyError):
+        pass
+    try:
+        for row in rows('calendar_dates.txt'):
+            day = datetime.strptime(row['date'], '%Y%m%d').date()
+            if day in days:
+                target = services[days.index(day)]
+                (target.add if row['exception_type'] == '1' else target.discard)(row['service_id'])
+    except (FileNotFoundError, KeyError):
+        pass
+    return services
+
+
+def zone_changes(zone, week, years):
+    """Returns (utc_start, offset_minutes) for every UTC offset change from the start of the week on."""
+    tz = ZoneInfo(zone)
+    moment = datetime.combine(week - timedelta(days=week.weekday()), datetime.min.time(), timezone.utc)
+    end = moment + timedelta(days=365 * years)
+    changes, last = [], None
+    while moment < end:
+        offset = int(moment.astimezone(tz).utcoffset().total_seconds() // 60)
+        if offset != last:
+            changes.append((int(moment.timestamp()), offset))
+            last = offset
+        moment += timedelta(hours=1)
+    changes[0] = (0, changes[0][1])
+    return changes
+
+
+def compile_index(rows, wanted, week, years):
+    """Collects the weekly departures of the wanted routes and returns the packed index."""
+    stop_names = {row['stop_id']: row['stop_name'] for row in rows('stops.txt') if row['stop_name'] in wanted}
+    routes = {}
+    for row in rows('routes.txt'):
+        category = row.get('route_desc') or ROUTE_TYPES.get(int(row['route_type']), '')
+        routes[row['route_id']] = (category, row.get('route_short_name', ''))
+    trips = {row['trip_id']: (routes[row['route_id']], row['service_id'], row.get('trip_headsign', ''))
+             for row in rows('trips.txt')}
+    services = week_services(rows, week)
+
+    departures = defaultdict(lambda: [[] for _ in range(7)])
+    for row in rows('stop_times.txt'):
+        name = stop_names.get(row['stop_id'])
+        trip = trips.get(row['trip_id'])
+        if name is None or trip is None or not row.get('departure_time'):
+            continue
+        (category, number), service, to = trip
+        if wanted[name] is not None and (category, number, to) not in wanted[name]:
+            continue
+        hours, minutes, _ = (int(x) for x in row['departure_time'].split(':'))
+        shift, minute = divmod(hours * 60 + minutes, 1440)
+        for day in range(7):
+            if service in services[day]:
+                departures[(name, category, number, to)][(day + shift) % 7].append(minute)
+
+    strings, index = [], {}
+
+    def intern(s):
+        if s not in index:
+            index[s] = len(strings)
+            strings.append(s)
+        return index[s]
+
+    route_records, minutes = [], []
+    for (name, category, number, to), days in sorted(departures.items()):
+        offsets = []
+        for day in days:
+            offsets.append(len(minutes))
+            minutes.extend(sorted(day))
+        offsets.append(len(minutes))
+        route_records.append(struct.pack(ROUTE, intern(name), intern(category), intern(number), intern(to), *offsets))
+
+    zone = next(rows('agency.txt'))['agency_timezone']
+    zones = zone_changes(zone, week, years)
+    out = bytearray(struct.pack(HEADER, MAGIC, VERSION, len(zones), len(strings), len(route_records), len(minutes)))
+    for change in zones:
+        out += struct.pack(ZONE, *change)
+    for s in strings:
+        encoded = s.encode()[:255]
+        out += bytes([len(encoded)]) + encoded
+    for record in route_records:
+        out += record
+    out += struct.pack(f'<{len(minutes)}H', *minutes)
+    return bytes(out), len(route_records), len(minutes)
+
+
+if __name__ == '__main__':
+    args = parser.parse_args()
+    wanted = monitored_routes(args.stations)
+    data, route_count, departure_count = compile_index(open_feed(args.source), wanted, args.week, args.years)
+    Path(args.target).write_bytes(data)
+    print(f'{args.target}: {route_count} routes, {departure_count} departures, {len(data)} bytes')